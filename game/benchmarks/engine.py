@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+from typing import Optional
+
+import numpy as np
+
+from game.config import MatchConfig
+from game.constants import MAP_SIZE, NUMBER_OF_ROUNDS
+from game.info import Info
+from game.player.player import Player
+from game.sinks import NullSink
+from game.state import State
+
+
+class BenchPlayer(Player):
+    """
+    Moves every mushroom unit in a random direction each round through the batch API, so that the time goes to the
+    engine and not to the player.
+    """
+
+    def play(self) -> None:
+        ids = list(self.mushrooms)
+        self.execute_many(ids, [self.rng.randrange(8) for _ in ids])
+
+    @staticmethod
+    def factory() -> BenchPlayer:
+        return BenchPlayer()
+
+
+def _new_match(
+    players: int, units: int, food: int, seed: int, config: MatchConfig
+) -> State:
+    """
+    Set up a match with the given number of players, mushroom units per player and food.
+    """
+    bench_players = list()
+    for k in range(players):
+        player = BenchPlayer()
+        player.name = f"{player.name}{k}"
+        bench_players.append(player)
+    info = Info()
+    for player in bench_players:
+        player.set_info(info)
+    state = State(info, bench_players, seed=seed, sink=NullSink(), config=config)
+    state._generate_mushroom_units()
+    for player in bench_players:
+        first = next(iter(player.mushrooms))
+        while len(player.mushrooms) < units:
+            state._split(first)
+    state.update_mushroom_units_info()
+    state._place_food(food)
+    return state
+
+
+def _play(state: State, rounds: int) -> tuple[list[int], int]:
+    """
+    Play the rounds of a match, timing State.next apart from the players.
+
+    Returns:
+        tuple[list[int], int]: The nanoseconds of every State.next and the nanoseconds spent in the players.
+    """
+    players = list(state._players.values())
+    latencies = list()
+    play_ns = 0
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for player in players:
+            player.reset()
+            player.play()
+        middle = time.perf_counter_ns()
+        state.next()
+        end = time.perf_counter_ns()
+        play_ns += middle - start
+        latencies.append(end - middle)
+    return latencies, play_ns
+
+
+def run(
+    players: int,
+    units: int,
+    food: int,
+    rounds: int = NUMBER_OF_ROUNDS,
+    seed: int = 0,
+    memory: bool = True,
+    map_size: int = MAP_SIZE,
+    sparse: bool = False,
+) -> dict:
+    """
+    Measure the rounds per second of the engine, the latency of each round and the peak memory of one match.
+
+    Memory is measured in a second run of the same match, tracemalloc slows everything down.
+    """
+    config = MatchConfig(map_size=map_size, sparse=sparse)
+    state = _new_match(players, units, food, seed, config)
+    food_placed = len(state._food)
+    latencies, play_ns = _play(state, rounds)
+    latencies_ms = np.asarray(latencies) / 1e6
+    result = {
+        "map_size": map_size,
+        "sparse": sparse,
+        "players": players,
+        "units_per_player": units,
+        "food": food,
+        "food_placed": food_placed,
+        "rounds": rounds,
+        "rounds_per_second": rounds / (sum(latencies) / 1e9),
+        "latency_ms": {
+            "p50": float(np.percentile(latencies_ms, 50)),
+            "p90": float(np.percentile(latencies_ms, 90)),
+            "p99": float(np.percentile(latencies_ms, 99)),
+            "max": float(latencies_ms.max()),
+        },
+        "play_seconds": play_ns / 1e9,
+    }
+
+    if memory:
+        tracemalloc.start()
+        _play(_new_match(players, units, food, seed, config), rounds)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_memory_bytes"] = peak
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Rounds per second of the engine for growing matches."
+    )
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument(
+        "--units",
+        type=int,
+        nargs="+",
+        default=[1, 10, 50],
+        help="Mushroom units per player, players cannot split past 50",
+    )
+    parser.add_argument("--food", type=int, nargs="+", default=[300, 500])
+    parser.add_argument("--map-sizes", type=int, nargs="+", default=[MAP_SIZE])
+    parser.add_argument(
+        "--sparse", action="store_true", help="Use the sparse board, for big maps"
+    )
+    parser.add_argument("--rounds", type=int, default=NUMBER_OF_ROUNDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": [
+            run(
+                players,
+                units,
+                food,
+                args.rounds,
+                args.seed,
+                not args.no_memory,
+                map_size,
+                args.sparse,
+            )
+            for map_size, players, units, food in itertools.product(
+                args.map_sizes, args.players, args.units, args.food
+            )
+        ],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
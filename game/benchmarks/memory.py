@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from game.utils import DIRECTIONS, Dir, MushroomUnit, Pos
+
+
+@dataclass
+class DictPos:
+    """
+    Position as it was before using __slots__, kept as the baseline of the benchmark.
+    """
+
+    i: int = 0
+    j: int = 0
+
+    def __add__(self, other: Dir) -> DictPos:
+        if isinstance(other, Dir):
+            return DictPos(self.i + other.value[0], self.j + other.value[1])
+        elif isinstance(other, DictPos):
+            return DictPos(self.i + other.i, self.j + other.j)
+
+
+@dataclass
+class DictMushroomUnit:
+    id: int
+    player: str
+    pos: DictPos
+
+
+def _measure(build: Callable[[], object]) -> dict:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = build()
+    after = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    del objects
+    return {
+        "bytes": current,
+        "peak_bytes": peak,
+        "allocations": sum(stat.count_diff for stat in stats),
+    }
+
+
+def _time_moves(start: object, n: int) -> float:
+    pos = start
+    begin = time.perf_counter()
+    for k in range(n):
+        pos = pos + DIRECTIONS[k & 7]
+    return time.perf_counter() - begin
+
+
+def run(units: int) -> dict:
+    """
+    Compare the memory and allocations of units with and without __slots__, and the cost of Pos + Dir.
+    """
+    ids = list(range(units))
+    slotted = _measure(
+        lambda: [
+            MushroomUnit(id, "player", Pos(k % 60, k // 60)) for k, id in enumerate(ids)
+        ]
+    )
+    baseline = _measure(
+        lambda: [
+            DictMushroomUnit(id, "player", DictPos(k % 60, k // 60))
+            for k, id in enumerate(ids)
+        ]
+    )
+    return {
+        "units": units,
+        "slotted": slotted,
+        "dict": baseline,
+        "bytes_saved_per_unit": (baseline["bytes"] - slotted["bytes"]) / units,
+        "allocations_saved": baseline["allocations"] - slotted["allocations"],
+        "move_seconds": _time_moves(Pos(), units),
+        "dict_move_seconds": _time_moves(DictPos(), units),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Memory used by mushroom units.")
+    parser.add_argument("--units", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args(argv)
+    print(json.dumps([run(units) for units in args.units], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import itertools
+from typing import Iterator, Optional
+
+import numpy as np
+
+from game.constants import MAP_SIZE
+from game.utils import Cell, CellType
+
+EMPTY: int = -1
+
+
+def _id(value: np.int32) -> Optional[int]:
+    return None if value == EMPTY else int(value)
+
+
+def _plane_value(id: Optional[int]) -> int:
+    return EMPTY if id is None else id
+
+
+class CellView:
+    """
+    Write-through view of a single board cell exposing the same attributes as Cell, so code that used to read or
+    write ``grid[i][j].type`` keeps working on top of the NumPy planes.
+    """
+
+    __slots__ = ("_board", "_i", "_j")
+
+    def __init__(self, board: Board, i: int, j: int):
+        self._board = board
+        self._i = i
+        self._j = j
+
+    @property
+    def type(self) -> CellType:
+        return CellType(int(self._board.cell_type[self._i, self._j]))
+
+    @type.setter
+    def type(self, value: CellType) -> None:
+        self._board.cell_type[self._i, self._j] = value.value
+
+    @property
+    def food_id(self) -> Optional[int]:
+        return _id(self._board.food[self._i, self._j])
+
+    @food_id.setter
+    def food_id(self, value: Optional[int]) -> None:
+        self._board.food[self._i, self._j] = _plane_value(value)
+
+    @property
+    def mushroom_id(self) -> Optional[int]:
+        return _id(self._board.occupant[self._i, self._j])
+
+    @mushroom_id.setter
+    def mushroom_id(self, value: Optional[int]) -> None:
+        self._board.occupant[self._i, self._j] = _plane_value(value)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Cell, CellView)):
+            return (
+                self.type == other.type
+                and self.food_id == other.food_id
+                and self.mushroom_id == other.mushroom_id
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return (
+            f"Cell(mushroom_id={self.mushroom_id!r}, food_id={self.food_id!r}, "
+            f"type={self.type})"
+        )
+
+
+class _RowView:
+    __slots__ = ("_board", "_i")
+
+    def __init__(self, board: Board, i: int):
+        self._board = board
+        self._i = i
+
+    def __getitem__(self, j: int) -> CellView:
+        return CellView(self._board, self._i, self._board.check_index(j))
+
+    def __setitem__(self, j: int, cell: Cell) -> None:
+        self._board.set_cell(self._i, self._board.check_index(j), cell)
+
+    def __len__(self) -> int:
+        return self._board.size
+
+    def __iter__(self) -> Iterator[CellView]:
+        return (self[j] for j in range(self._board.size))
+
+
+class Board:
+    """
+    Game board stored as typed NumPy planes instead of one Cell object per position.
+
+    * ``cell_type``: CellType value of each cell (int8).
+    * ``food_quantity``: remaining food units on each cell (int32, 0 when there is no food).
+    * ``food`` and ``occupant``: ids of the food and mushroom unit on each cell (int32, EMPTY if none).
+
+    Indexing the board as ``board[i][j]`` returns a CellView, which keeps the old ``list[list[Cell]]`` access pattern
+    working.
+    """
+
+    def __init__(self, size: int = MAP_SIZE):
+        self.size: int = size
+        self.cell_type: np.ndarray = np.full(
+            (size, size), CellType.NORMAL.value, dtype=np.int8
+        )
+        self.food_quantity: np.ndarray = np.zeros((size, size), dtype=np.int32)
+        self.food: np.ndarray = np.full((size, size), EMPTY, dtype=np.int32)
+        self.occupant: np.ndarray = np.full((size, size), EMPTY, dtype=np.int32)
+
+    def check_index(self, index: int) -> int:
+        """
+        Validate a row or column index, mirroring the IndexError raised by the old nested lists.
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("board index out of range")
+        return index
+
+    def place_food(self, i: int, j: int, food_id: int, quantity: int) -> None:
+        self.cell_type[i, j] = CellType.FOOD.value
+        self.food[i, j] = food_id
+        self.food_quantity[i, j] = quantity
+
+    def remove_food(self, i: int, j: int) -> None:
+        """
+        Mark a food cell as normal again. The food id is kept on the cell, as the Cell grid used to do.
+        """
+        self.cell_type[i, j] = CellType.NORMAL.value
+        self.food_quantity[i, j] = 0
+
+    def eat(self, i: int, j: int, n: int = 1) -> int:
+        """
+        Take n units from the food on (i, j).
+
+        Returns:
+            int: The units of food left on the cell.
+        """
+        self.food_quantity[i, j] -= n
+        return int(self.food_quantity[i, j])
+
+    def food_id_at(self, i: int, j: int) -> Optional[int]:
+        return _id(self.food[i, j])
+
+    def set_occupant(self, i: int, j: int, mushroom_id: Optional[int]) -> None:
+        self.occupant[i, j] = _plane_value(mushroom_id)
+
+    def clear_occupants(self) -> None:
+        self.occupant.fill(EMPTY)
+
+    def is_food(self, i: int, j: int) -> bool:
+        return self.cell_type[i, j] == CellType.FOOD.value
+
+    def food_mask(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Check which of the given packed cells (``i * size + j``) hold food.
+        """
+        return self.cell_type.reshape(-1)[cells] == CellType.FOOD.value
+
+    def quantities(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Get the units of food left on the given packed cells (``i * size + j``).
+        """
+        return self.food_quantity.reshape(-1)[cells]
+
+    def food_cells(self) -> list[tuple[int, int]]:
+        return list(
+            zip(
+                *(a.tolist() for a in np.nonzero(self.cell_type == CellType.FOOD.value))
+            )
+        )
+
+    def occupied_cells(self) -> list[tuple[int, int]]:
+        return list(zip(*(a.tolist() for a in np.nonzero(self.occupant != EMPTY))))
+
+    def is_free(self, i0: int, i1: int, j0: int, j1: int) -> bool:
+        """
+        Check that no cell in the window [i0, i1) x [j0, j1) holds food or a mushroom unit.
+        """
+        return not (
+            (self.cell_type[i0:i1, j0:j1] == CellType.FOOD.value).any()
+            or (self.occupant[i0:i1, j0:j1] != EMPTY).any()
+        )
+
+    def cell(self, i: int, j: int) -> Cell:
+        """
+        Get a detached Cell snapshot of the given position.
+        """
+        return Cell(
+            mushroom_id=_id(self.occupant[i, j]),
+            food_id=_id(self.food[i, j]),
+            type=CellType(int(self.cell_type[i, j])),
+        )
+
+    def set_cell(self, i: int, j: int, cell: Cell) -> None:
+        self.cell_type[i, j] = cell.type.value
+        self.food[i, j] = _plane_value(cell.food_id)
+        self.occupant[i, j] = _plane_value(cell.mushroom_id)
+        if cell.type != CellType.FOOD:
+            self.food_quantity[i, j] = 0
+
+    def __getitem__(self, i: int) -> _RowView:
+        return _RowView(self, self.check_index(i))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[_RowView]:
+        return (self[i] for i in range(self.size))
+
+
+class SparseBoard:
+    """
+    Game board that only stores the cells with food or a mushroom unit, for maps where almost every cell is empty.
+
+    It has the same methods as Board, keyed by the packed cell ``i * size + j``, so its memory does not depend on the
+    size of the map. It has no planes and cannot be indexed as ``board[i][j]``, use cell and set_cell instead.
+    """
+
+    def __init__(self, size: int = MAP_SIZE):
+        self.size: int = size
+        # Units of food left on every food cell
+        self._quantity: dict[int, int] = dict()
+        # Food ids are kept after the food runs out, as Board does
+        self._food: dict[int, int] = dict()
+        self._occupant: dict[int, int] = dict()
+
+    def check_index(self, index: int) -> int:
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("board index out of range")
+        return index
+
+    def place_food(self, i: int, j: int, food_id: int, quantity: int) -> None:
+        cell = i * self.size + j
+        self._food[cell] = food_id
+        self._quantity[cell] = quantity
+
+    def remove_food(self, i: int, j: int) -> None:
+        self._quantity.pop(i * self.size + j, None)
+
+    def eat(self, i: int, j: int, n: int = 1) -> int:
+        cell = i * self.size + j
+        self._quantity[cell] -= n
+        return self._quantity[cell]
+
+    def food_id_at(self, i: int, j: int) -> Optional[int]:
+        return self._food.get(i * self.size + j)
+
+    def set_occupant(self, i: int, j: int, mushroom_id: Optional[int]) -> None:
+        if mushroom_id is None:
+            self._occupant.pop(i * self.size + j, None)
+        else:
+            self._occupant[i * self.size + j] = mushroom_id
+
+    def clear_occupants(self) -> None:
+        self._occupant.clear()
+
+    def is_food(self, i: int, j: int) -> bool:
+        return i * self.size + j in self._quantity
+
+    def food_mask(self, cells: np.ndarray) -> np.ndarray:
+        quantity = self._quantity
+        return np.fromiter(
+            (cell in quantity for cell in cells.tolist()), dtype=bool, count=len(cells)
+        )
+
+    def quantities(self, cells: np.ndarray) -> np.ndarray:
+        quantity = self._quantity
+        return np.fromiter(
+            (quantity.get(cell, 0) for cell in cells.tolist()),
+            dtype=np.int32,
+            count=len(cells),
+        )
+
+    def food_cells(self) -> list[tuple[int, int]]:
+        return [divmod(cell, self.size) for cell in self._quantity]
+
+    def occupied_cells(self) -> list[tuple[int, int]]:
+        return [divmod(cell, self.size) for cell in self._occupant]
+
+    def is_free(self, i0: int, i1: int, j0: int, j1: int) -> bool:
+        for cell in itertools.chain(self._quantity, self._occupant):
+            i, j = divmod(cell, self.size)
+            if i0 <= i < i1 and j0 <= j < j1:
+                return False
+        return True
+
+    def cell(self, i: int, j: int) -> Cell:
+        cell = i * self.size + j
+        return Cell(
+            mushroom_id=self._occupant.get(cell),
+            food_id=self._food.get(cell),
+            type=CellType.FOOD if cell in self._quantity else CellType.NORMAL,
+        )
+
+    def set_cell(self, i: int, j: int, cell: Cell) -> None:
+        packed = i * self.size + j
+        for table, value in (
+            (self._food, cell.food_id),
+            (self._occupant, cell.mushroom_id),
+        ):
+            if value is None:
+                table.pop(packed, None)
+            else:
+                table[packed] = value
+        if cell.type == CellType.FOOD:
+            self._quantity.setdefault(packed, 0)
+        else:
+            self._quantity.pop(packed, None)
+
+    def __len__(self) -> int:
+        return self.size
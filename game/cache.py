@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import time
+from typing import Iterator, Optional
+
+from game.config import MatchConfig
+from game.manifest import LazyPlayer, dependency_hashes
+from game.register import Registry
+
+# Modules whose code decides the outcome of a match, a change in any of them invalidates every cached result
+ENGINE_MODULES: tuple[str, ...] = (
+    "game.board",
+    "game.config",
+    "game.constants",
+    "game.fields",
+    "game.index",
+    "game.info",
+    "game.main",
+    "game.placement",
+    "game.player.player",
+    "game.replay",
+    "game.rng",
+    "game.state",
+    "game.utils",
+)
+
+# Temporary files older than this are left by workers that died, evict deletes them
+STALE_SECONDS: float = 3600.0
+
+
+def source_hash(module: str) -> Optional[str]:
+    """
+    Get the SHA-256 of the source of a module without importing it, None if it has no source file.
+    """
+    spec = importlib.util.find_spec(module)
+    if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+        return None
+    with open(spec.origin, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def engine_version() -> str:
+    """
+    Get the hash of the sources of the engine, see ENGINE_MODULES.
+    """
+    digest = hashlib.sha256()
+    for module in ENGINE_MODULES:
+        digest.update(f"{module}:{source_hash(module)}\n".encode())
+    return digest.hexdigest()
+
+
+def player_sources(module: str) -> Optional[list[list]]:
+    """
+    Get the hashes of the sources a player module depends on: the module itself and the modules of its package it
+    imports or inherits players from, see dependency_hashes. The engine modules are left out, engine_version has them.
+
+    Returns:
+        Optional[list[list]]: The [module, hash] pairs sorted by module, None if one of them has no source file.
+    """
+    package_name = module.rpartition(".")[0]
+    if package_name:
+        hashes = dependency_hashes(importlib.import_module(package_name), module)
+    else:
+        hashes = {module: source_hash(module)}
+    hashes = {
+        name: sha256 for name, sha256 in hashes.items() if name not in ENGINE_MODULES
+    }
+    if None in hashes.values():
+        return None
+    return sorted([name, sha256] for name, sha256 in hashes.items())
+
+
+def player_module(player_name: str) -> Optional[str]:
+    """
+    Get the module of a registered player without importing it, None if it cannot be told.
+    """
+    factory = Registry.registered_players.get(player_name)
+    if isinstance(factory, LazyPlayer):
+        return factory.module
+    return getattr(factory, "__module__", None)
+
+
+class ResultCache:
+    """
+    Results of matches stored on disk under a key that addresses their content.
+
+    The key of a match is the hash of the sources of its players (in order) together with the modules of their
+    packages they depend on, of the engine, of its seed and of its config, so a result is found again as long as none
+    of them changed and is never served after any of them did.
+    Every entry is a JSON file with the scores and winners, optionally next to the replay of the match. The cache is
+    bounded in bytes: using an entry refreshes its modification time and the least recently used entries are deleted
+    when it grows over max_bytes.
+    """
+
+    def __init__(
+        self, directory: str, max_bytes: int = 256 * 1024**2, replays: bool = False
+    ):
+        """
+        Args:
+            directory (str): Directory of the cache, created if needed.
+            max_bytes (int): Maximum size of the entries, replays included.
+            replays (bool): Store the replay of every match, entries without a replay are then missed.
+        """
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.replays: bool = replays
+        self._engine: Optional[str] = None
+        self._sources: dict[str, Optional[list[list]]] = dict()
+        self._size: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def key(
+        self, player_names: list[str], seed: int, config: Optional[MatchConfig] = None
+    ) -> Optional[str]:
+        """
+        Get the key of a match, None if it cannot be cached because the source of a player is unknown.
+
+        Sources are hashed once per cache, so players changed while the cache is in use are not seen.
+        """
+        if self._engine is None:
+            self._engine = engine_version()
+        players = list()
+        for player_name in player_names:
+            module = player_module(player_name)
+            if module is None:
+                return None
+            if module not in self._sources:
+                self._sources[module] = player_sources(module)
+            if self._sources[module] is None:
+                return None
+            players.append([player_name, module, self._sources[module]])
+        description = {
+            "players": players,
+            "engine": self._engine,
+            "seed": seed,
+            "config": dataclasses.asdict(config or MatchConfig()),
+        }
+        return hashlib.sha256(
+            json.dumps(description, sort_keys=True).encode()
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Get the result stored under a key and mark it as used.
+
+        Returns:
+            Optional[dict]: The result, None if there is no valid entry for the key.
+        """
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        if self.replays and not os.path.isfile(self.replay_path(key)):
+            return None
+        now = time.time()
+        os.utime(path, (now, now))
+        return entry["result"]
+
+    def put(self, key: str, result: dict, replay_file: Optional[str] = None) -> None:
+        """
+        Store the result of a match, then evict the least recently used entries if the cache is too big.
+
+        Args:
+            key (str): The key of the match.
+            result (dict): The result, anything that can be dumped as JSON.
+            replay_file (Optional[str]): Replay of the match, moved into the cache.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = self._total_size() - self._entry_size(key)
+        if replay_file is not None:
+            os.replace(replay_file, self.replay_path(key))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"key": key, "result": result}, f)
+        os.replace(tmp, path)
+        self._size = size + self._entry_size(key)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def replay_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.replay")
+
+    def new_replay_file(self, key: str) -> str:
+        """
+        Get a temporary file where a worker can save the replay of a match before it is put in the cache.
+        """
+        path = self.replay_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+
+    def evict(self) -> None:
+        """
+        Delete the temporary files left by dead workers, then the least recently used entries until the cache fits
+        in max_bytes.
+        """
+        size = self._total_size()
+        stale = time.time() - STALE_SECONDS
+        for entry in self._files():
+            if entry.name.endswith(".tmp"):
+                try:
+                    stat = entry.stat()
+                    if stat.st_mtime < stale:
+                        os.remove(entry.path)
+                        size -= stat.st_size
+                except FileNotFoundError:
+                    pass
+
+        entries = list()
+        for key in self._keys():
+            try:
+                used = os.stat(self._path(key)).st_mtime
+            except OSError:
+                continue
+            entries.append((used, key))
+        entries.sort()
+        for _, key in entries:
+            if size <= self.max_bytes:
+                break
+            size -= self._entry_size(key)
+            for path in (self._path(key), self.replay_path(key)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        self._size = size
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._keys())
+
+    def _path(self, key: str) -> str:
+        # Entries are spread over 256 subdirectories so that no directory gets huge
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _files(self) -> Iterator[os.DirEntry]:
+        for bucket in os.scandir(self.directory):
+            if bucket.is_dir():
+                yield from os.scandir(bucket.path)
+
+    def _keys(self) -> Iterator[str]:
+        for entry in self._files():
+            if entry.name.endswith(".json"):
+                yield entry.name[: -len(".json")]
+
+    def _entry_size(self, key: str) -> int:
+        size = 0
+        for path in (self._path(key), self.replay_path(key)):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _total_size(self) -> int:
+        # Temporary files found when the cache is opened count until evict deletes them
+        if self._size is None:
+            self._size = sum(self._entry_size(key) for key in self._keys()) + sum(
+                entry.stat().st_size
+                for entry in self._files()
+                if entry.name.endswith(".tmp")
+            )
+        return self._size
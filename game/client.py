@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from typing import Callable, Optional
+
+from game.info import Info
+from game.main import discover_player_classes
+from game.player.player import Player
+from game.protocol import apply_update, encode_commands, read_message, write_message
+from game.register import Registry
+from game.rng import MatchRandom
+
+
+async def run_bot(
+    factory: Callable[[], Player],
+    host: str = "127.0.0.1",
+    port: int = 7000,
+    path: Optional[str] = None,
+    name: Optional[str] = None,
+) -> dict:
+    """
+    Connect a player to a MatchServer and play one match.
+
+    Args:
+        factory (Callable[[], Player]): Creates the player.
+        host (str): Host of the server.
+        port (int): Port of the server.
+        path (Optional[str]): Unix socket of the server, used instead of host and port if given.
+        name (Optional[str]): Name of the bot, the name of the player by default.
+
+    Returns:
+        dict: The "end" message of the match, with the scores and winners.
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    player = factory()
+    info = Info()
+    player.set_info(info)
+    try:
+        await write_message(writer, {"type": "hello", "name": name or player.name})
+        while True:
+            message = await read_message(reader)
+            if message["type"] == "start":
+                player.name = message["name"]
+                player.set_rng(MatchRandom(message["seed"]).for_player(player.name))
+            elif message["type"] == "round":
+                apply_update(player, info, message)
+                player.reset()
+                player.play()
+                await write_message(
+                    writer,
+                    {
+                        "type": "commands",
+                        "round": message["round"],
+                        "commands": encode_commands(player),
+                    },
+                )
+            elif message["type"] == "end":
+                return message
+    finally:
+        writer.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Play a match on a match server.")
+    parser.add_argument("player", help="Name of a registered player")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--unix", help="Unix socket of the server")
+    args = parser.parse_args(argv)
+
+    discover_player_classes()
+    factory = Registry.registered_players[args.player]
+    result = asyncio.run(run_bot(factory, args.host, args.port, args.unix))
+    print(f"Scores {result['scores']} winners {result['winners']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from game.board import Board, SparseBoard
+from game.constants import (
+    MAP_SIZE,
+    MAX_ATTEMPTS,
+    MAX_FOOD,
+    MAX_QUANTITY_OF_FOOD,
+    MIN_DISTANCE_FOOD,
+    MIN_DISTANCE_SPAWN_SQUARED,
+    MIN_FOOD,
+    MIN_QUANTITY_OF_FOOD,
+    NUMBER_OF_ROUNDS,
+)
+
+
+@dataclass(frozen=True)
+class MatchConfig:
+    """
+    Settings of a match. The defaults are the ones in game.constants.
+    """
+
+    map_size: int = MAP_SIZE
+    rounds: int = NUMBER_OF_ROUNDS
+    min_food: int = MIN_FOOD
+    max_food: int = MAX_FOOD
+    min_quantity_of_food: int = MIN_QUANTITY_OF_FOOD
+    max_quantity_of_food: int = MAX_QUANTITY_OF_FOOD
+    min_distance_food: int = MIN_DISTANCE_FOOD
+    min_distance_spawn_squared: int = MIN_DISTANCE_SPAWN_SQUARED
+    max_attempts: int = MAX_ATTEMPTS
+    # Store only the cells with food or mushroom units instead of dense planes, for maps far bigger than the default
+    sparse: bool = False
+
+    def new_board(self) -> Board:
+        """
+        Create an empty board of the map size, dense or sparse.
+        """
+        if self.sparse:
+            return SparseBoard(self.map_size)
+        return Board(self.map_size)
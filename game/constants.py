@@ -1,6 +1,6 @@
 MIN_FOOD = 300
 MAX_FOOD = 500
-MAX_ATTEMPTS = 3
+MAX_ATTEMPTS = 100_000
 MIN_DISTANCE_FOOD = 1
 MAP_SIZE = 60
 MIN_QUANTITY_OF_FOOD = 5
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+from game.board import EMPTY
+from game.constants import MAP_SIZE
+from game.utils import DIR_OFFSETS, Dir, Pos
+
+# Distance of the cells that cannot reach any food, bigger than any real distance
+UNREACHABLE: int = 2**30
+
+# Offsets of the 8 neighbours of a cell, in the order of Dir
+_OFFSETS: tuple[tuple[int, int], ...] = tuple(DIR_OFFSETS.values())
+_STEPS: dict[tuple[int, int], Dir] = {offset: d for d, offset in DIR_OFFSETS.items()}
+
+
+def _shift(di: int, dj: int, rows: int, cols: int) -> tuple[tuple, tuple]:
+    """
+    Get the slices of the cells (i, j) and of their neighbours (i - di, j - dj) inside a rows x cols window.
+    """
+    dst = (slice(max(di, 0), rows + min(di, 0)), slice(max(dj, 0), cols + min(dj, 0)))
+    src = (slice(max(-di, 0), rows - max(di, 0)), slice(max(-dj, 0), cols - max(dj, 0)))
+    return dst, src
+
+
+class DistanceField:
+    """
+    Distance from every cell to the closest food and the way to get there, moving in the 8 directions.
+
+    ``distance`` holds the number of moves to the closest food (UNREACHABLE if there is none left) and ``source``
+    the packed cell ``i * size + j`` of that food (EMPTY if there is none left). The field is built with a
+    multi-source BFS from all the food cells at once, expanding one ring of cells per step with NumPy. When a food
+    runs out only the cells that were closest to it are recomputed.
+    """
+
+    def __init__(self, size: int = MAP_SIZE):
+        self.size: int = size
+        self.distance: np.ndarray = np.full((size, size), UNREACHABLE, dtype=np.int32)
+        self.source: np.ndarray = np.full((size, size), EMPTY, dtype=np.int32)
+
+    @classmethod
+    def from_sources(
+        cls, sources: Iterable[tuple[int, int]], size: int = MAP_SIZE
+    ) -> DistanceField:
+        """
+        Build the field of the given food cells.
+
+        Args:
+            sources (Iterable[tuple[int, int]]): The (i, j) of every food cell.
+            size (int): The side of the map.
+        """
+        field = cls(size)
+        frontier = np.zeros((size, size), dtype=bool)
+        for i, j in sources:
+            field.distance[i, j] = 0
+            field.source[i, j] = i * size + j
+            frontier[i, j] = True
+
+        level = 0
+        while frontier.any():
+            level += 1
+            for di, dj in _OFFSETS:
+                dst, src = _shift(di, dj, size, size)
+                reached = frontier[src] & (field.distance[dst] == UNREACHABLE)
+                field.distance[dst][reached] = level
+                field.source[dst][reached] = field.source[src][reached]
+            frontier = field.distance == level
+        return field
+
+    def remove(self, i: int, j: int) -> None:
+        """
+        Update the field after the food on (i, j) runs out.
+
+        The distances of the cells that were closest to another food do not change. The cells that were closest to
+        this one are relaxed from the cells around them until the distances settle, which only touches the bounding
+        box of those cells.
+        """
+        orphans = self.source == i * self.size + j
+        rows, cols = np.nonzero(orphans)
+        if len(rows) == 0:
+            return
+        window = (
+            slice(max(rows.min() - 1, 0), min(rows.max() + 2, self.size)),
+            slice(max(cols.min() - 1, 0), min(cols.max() + 2, self.size)),
+        )
+        distance = self.distance[window]
+        source = self.source[window]
+        orphans = orphans[window]
+        distance[orphans] = UNREACHABLE
+        source[orphans] = EMPTY
+
+        height, width = distance.shape
+        changed = True
+        while changed:
+            changed = False
+            for di, dj in _OFFSETS:
+                dst, src = _shift(di, dj, height, width)
+                closer = orphans[dst] & (distance[src] + 1 < distance[dst])
+                if closer.any():
+                    distance[dst][closer] = distance[src][closer] + 1
+                    source[dst][closer] = source[src][closer]
+                    changed = True
+
+    def distance_at(self, i: int, j: int) -> Optional[int]:
+        """
+        Get the number of moves from (i, j) to the closest food, None if there is no food left.
+        """
+        distance = int(self.distance[i, j])
+        return None if distance == UNREACHABLE else distance
+
+    def nearest(self, i: int, j: int) -> Optional[Pos]:
+        """
+        Get the position of the food closest to (i, j), None if there is no food left.
+        """
+        source = int(self.source[i, j])
+        if source == EMPTY:
+            return None
+        return Pos(*divmod(source, self.size))
+
+    def next_step(self, i: int, j: int) -> Optional[Dir]:
+        """
+        Get the direction to move from (i, j) towards the closest food, None if already on food or there is none.
+        """
+        target = self.nearest(i, j)
+        if target is None or (target.i, target.j) == (i, j):
+            return None
+        return _STEPS[(_sign(target.i - i), _sign(target.j - j))]
+
+
+def _sign(x: int) -> int:
+    return (x > 0) - (x < 0)
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, replace
+from typing import Iterable, Mapping, Optional, Union
+
+import numpy as np
+
+from game.config import MatchConfig
+from game.info import Info
+from game.player.player import Player
+from game.sinks import NullSink
+from game.state import State
+from game.utils import BranchCommand, Food, MoveCommand, MushroomUnit, Pos
+
+Command = Union[MoveCommand, BranchCommand]
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Everything a forward model needs to go back to a round, as flat arrays.
+
+    ``units`` has one row ``(id, player index, i, j)`` per mushroom unit and ``food`` one row ``(id, i, j,
+    quantity)`` per food, so taking a snapshot copies a few integers per entity instead of deep-copying objects.
+    """
+
+    players: tuple[str, ...]
+    scores: np.ndarray
+    units: np.ndarray
+    food: np.ndarray
+    round: int
+    next_unit_id: int
+    rng_state: tuple
+
+
+class _Puppet(Player):
+    """
+    Player of a forward model, it plays the commands given to step instead of deciding them.
+    """
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+
+    def play(self) -> None:
+        pass
+
+    @staticmethod
+    def factory() -> _Puppet:
+        raise NotImplementedError("Puppets are created by the forward model")
+
+
+class ForwardModel:
+    """
+    Simulation of the next rounds of a match from what a player can see, for bots that search ahead.
+
+    The model runs its own State with the real rules of State.next, but it is built only from an Info: the food, the
+    scores and the mushroom units. It never touches the state or the random streams of the real match, it draws the
+    order of the commands and the cells of the new mushroom units from its own generator instead. Mushroom units
+    created by the model may therefore not get the ids or cells they will get in the real match.
+
+    Going back is cheap: snapshot copies the match into a few arrays and restore rebuilds it in place, step keeps a
+    snapshot per round so undo can go back one round, and fork creates an independent model from the current round.
+
+        model = ForwardModel.from_info(self.info, seed=self.rng.getrandbits(64))
+        root = model.snapshot()
+        for plan in plans:
+            model.step({self.name: plan})
+            ...
+            model.restore(root)
+    """
+
+    def __init__(
+        self,
+        snapshot: Snapshot,
+        config: Optional[MatchConfig] = None,
+    ):
+        """
+        Args:
+            snapshot (Snapshot): The match to start from, its random state is used for the rounds simulated.
+            config (Optional[MatchConfig]): The rules of the match, the default ones if None.
+        """
+        self.config: MatchConfig = config if config is not None else MatchConfig()
+        self.info: Info = Info()
+        self._players: dict[str, _Puppet] = {
+            name: _Puppet(name) for name in snapshot.players
+        }
+        for player in self._players.values():
+            player.set_info(self.info)
+        self._state: State = State(
+            self.info,
+            list(self._players.values()),
+            seed=0,
+            sink=NullSink(),
+            config=self.config,
+        )
+        self._history: list[Snapshot] = list()
+        self.restore(snapshot)
+
+    @classmethod
+    def from_info(
+        cls,
+        info: Info,
+        config: Optional[MatchConfig] = None,
+        seed: Optional[int] = None,
+    ) -> ForwardModel:
+        """
+        Create a forward model of the current round of a match.
+
+        Build it at the start of play, the splits asked before already took their cost from the score in info.
+
+        Args:
+            info (Info): The information of the match, as seen by a player.
+            config (Optional[MatchConfig]): The rules of the match, the default ones with the map size of info if
+                None.
+            seed (Optional[int]): Seed of the generator of the model, a random one if None.
+
+        Returns:
+            ForwardModel: A model at the round of info.
+        """
+        if config is None:
+            config = MatchConfig(map_size=info.map_size)
+        players = tuple(info.players)
+        index = {name: k for k, name in enumerate(players)}
+        units = _rows(
+            (unit.id, index[unit.player], unit.pos.i, unit.pos.j)
+            for unit in info._units
+        )
+        food = _rows(
+            (food.id, food.pos.i, food.pos.j, food.quantity)
+            for food in info.food.values()
+        )
+        snapshot = Snapshot(
+            players=players,
+            scores=np.array(
+                [info.players[name]["score"] for name in players], dtype=np.int64
+            ),
+            units=units,
+            food=food,
+            round=info.round,
+            next_unit_id=int(units[:, 0].max()) + 1 if len(units) else 0,
+            rng_state=random.Random(seed).getstate(),
+        )
+        return cls(snapshot, config)
+
+    @property
+    def round(self) -> int:
+        return self._state.round
+
+    def scores(self) -> dict[str, int]:
+        return {name: player.score for name, player in self._players.items()}
+
+    def mushrooms(self, player_name: str) -> Mapping[int, MushroomUnit]:
+        """
+        Get the mushroom units of a player in the simulated round. They change as the model steps, do not keep them.
+        """
+        return self._players[player_name].mushrooms
+
+    def step(self, commands: Optional[Mapping[str, Iterable[Command]]] = None) -> None:
+        """
+        Simulate one round.
+
+        Splits go through Player.split, so they cost five points and are ignored once the player cannot afford them,
+        as in a real match.
+
+        Args:
+            commands (Optional[Mapping[str, Iterable[Command]]]): The commands of each player for this round, players
+                that are not in it do nothing.
+        """
+        self._history.append(self.snapshot())
+        commands = commands if commands is not None else dict()
+        for name, player in self._players.items():
+            player.reset()
+            for command in commands.get(name, ()):
+                if isinstance(command, BranchCommand):
+                    unit = player.mushrooms.get(command.id)
+                    if unit is not None:
+                        player.split(unit)
+                else:
+                    player.execute(command)
+        self._state.next()
+
+    def undo(self) -> None:
+        """
+        Go back to the round before the last step.
+
+        Raises:
+            IndexError: If there is no step to undo.
+        """
+        if not self._history:
+            raise IndexError("There is no step to undo")
+        history = self._history
+        self.restore(history.pop())
+        self._history = history
+
+    def fork(self, seed: Optional[int] = None) -> ForwardModel:
+        """
+        Create an independent model at the current round. Its undo history starts empty.
+
+        Args:
+            seed (Optional[int]): Seed of the generator of the new model, None to continue the generator of this one.
+        """
+        snapshot = self.snapshot()
+        if seed is not None:
+            snapshot = replace(snapshot, rng_state=random.Random(seed).getstate())
+        return ForwardModel(snapshot, self.config)
+
+    def snapshot(self) -> Snapshot:
+        state = self._state
+        names = tuple(self._players)
+        index = {name: k for k, name in enumerate(names)}
+        return Snapshot(
+            players=names,
+            scores=np.array(
+                [player.score for player in self._players.values()], dtype=np.int64
+            ),
+            units=_rows(
+                (unit.id, index[unit.player], unit.pos.i, unit.pos.j)
+                for unit in state._units
+            ),
+            food=_rows(
+                (food.id, food.pos.i, food.pos.j, food.quantity)
+                for food in state._food.values()
+            ),
+            round=state.round,
+            next_unit_id=state._unit_ids.next_id,
+            rng_state=state._rng.getstate(),
+        )
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """
+        Go back to a snapshot of this model. The undo history is cleared.
+
+        Raises:
+            ValueError: If the snapshot has other players.
+        """
+        if snapshot.players != tuple(self._players):
+            raise ValueError("The snapshot is from a match with other players")
+        state = self._state
+        grid = state.grid
+        state._units.clear()
+        state._total_score.clear()
+
+        players = [self._players[name] for name in snapshot.players]
+        for player, score in zip(players, snapshot.scores.tolist()):
+            player.reset()
+            player.mushrooms.clear()
+            player.score = score
+            state._total_score[player.name] = score
+        for id, k, i, j in snapshot.units.tolist():
+            unit = MushroomUnit(id=id, player=players[k].name, pos=Pos(i, j))
+            players[k].mushrooms[id] = unit
+            state._units.add(unit)
+
+        # Food only runs out or loses units while stepping, so only the food that changed since the snapshot is
+        # written back, and the cached views of info are only updated for it
+        food = state._food
+        kept = set()
+        for id, i, j, quantity in snapshot.food.tolist():
+            kept.add(id)
+            current = food.get(id)
+            if current is None or current.quantity != quantity:
+                food[id] = Food(id=id, quantity=quantity, pos=Pos(i, j))
+                grid.place_food(i, j, id, quantity)
+                if current is None:
+                    self.info.food_placed(food[id])
+        for id in [id for id in food if id not in kept]:
+            grid.remove_food(food[id].pos.i, food[id].pos.j)
+            self.info.food_finished(food.pop(id))
+
+        state._unit_ids.next_id = snapshot.next_unit_id
+        state._rng.setstate(snapshot.rng_state)
+        state.round = self.info.round = snapshot.round
+        state.update_mushroom_units_info(full=True)
+        self._history = list()
+
+
+def _rows(rows: Iterable[tuple[int, int, int, int]]) -> np.ndarray:
+    return np.array(list(rows), dtype=np.int64).reshape(-1, 4)
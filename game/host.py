@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+import traceback
+from multiprocessing.connection import Connection, wait
+from typing import Callable
+
+from game.info import Info
+from game.player.player import Player
+from game.protocol import (
+    FoodTracker,
+    apply_commands,
+    apply_update,
+    encode_commands,
+    round_update,
+)
+from game.rng import MatchRandom
+from game.state import State
+
+
+class RemotePlayer(Player):
+    """
+    Engine-side stand-in of a player whose code runs somewhere else. It holds the units and score of the player and
+    receives its commands, but never plays by itself.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.name = name
+
+    @staticmethod
+    def factory() -> RemotePlayer:
+        return RemotePlayer(RemotePlayer.__name__)
+
+    def play(self) -> None:
+        pass
+
+
+def _serve_player(
+    conn: Connection, factory: Callable[[], Player], name: str, seed: int
+) -> None:
+    """
+    Entry point of the process hosting a player: apply each round update, play and send back the commands.
+    """
+    player = factory()
+    player.name = name
+    info = Info()
+    player.set_info(info)
+    player.set_rng(MatchRandom(seed).for_player(name))
+    while True:
+        update = conn.recv()
+        # Catch up if the previous rounds took too long, only the latest one is played
+        while update is not None and conn.poll():
+            apply_update(player, info, update)
+            update = conn.recv()
+        if update is None:
+            break
+        apply_update(player, info, update)
+        player.reset()
+        try:
+            player.play()
+        except Exception:
+            traceback.print_exc()
+        conn.send((update["round"], encode_commands(player)))
+    conn.close()
+
+
+class PlayerHost:
+    """
+    Runs every player in its own process.
+
+    Each round the players get a compact update of the Info and play concurrently. Commands received after the
+    deadline of the round are dropped, so a round takes as long as the slowest player (bounded by the deadline)
+    instead of the sum of all of them, and a player that crashes or hangs cannot block the match.
+    """
+
+    def __init__(
+        self, factories: dict[str, Callable[[], Player]], deadline: float = 1.0
+    ):
+        """
+        Args:
+            factories (dict[str, Callable[[], Player]]): The factory of each player, by name.
+            deadline (float): Seconds the players have to send their commands each round.
+        """
+        self.deadline: float = deadline
+        self._factories = factories
+        self.players: list[RemotePlayer] = [RemotePlayer(name) for name in factories]
+        self._conns: dict[Connection, RemotePlayer] = dict()
+        self._processes: list[multiprocessing.Process] = list()
+        self._food = FoodTracker()
+
+    def start(self, seed: int) -> None:
+        """
+        Start the process of every player.
+
+        Args:
+            seed (int): The seed of the match, players derive their random stream from it.
+        """
+        for player in self.players:
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_serve_player,
+                args=(child_conn, self._factories[player.name], player.name, seed),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._conns[parent_conn] = player
+            self._processes.append(process)
+
+    def play_round(self, state: State) -> None:
+        """
+        Send the round update to every player and collect the commands sent before the deadline.
+        """
+        food_delta = self._food.delta(state.info.food)
+        for conn, player in self._conns.items():
+            player.set_info(state.info)
+            player.reset()
+            try:
+                conn.send(round_update(state.info, player, food_delta))
+            except (BrokenPipeError, OSError):
+                pass
+
+        end = time.monotonic() + self.deadline
+        pending = {conn for conn in self._conns}
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            for conn in wait(list(pending), timeout=remaining):
+                try:
+                    round, commands = conn.recv()
+                except (EOFError, OSError):
+                    pending.discard(conn)
+                    continue
+                # Answers to previous rounds arrive late and are dropped
+                if round == state.info.round:
+                    apply_commands(self._conns[conn], commands)
+                    pending.discard(conn)
+
+    def close(self) -> None:
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=self.deadline)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+
+    def __enter__(self) -> PlayerHost:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from typing import Iterator, Mapping, Optional, Union
+
+from game.board import Board, SparseBoard
+from game.constants import MAP_SIZE
+from game.utils import Food, MushroomUnit, Pos
+
+
+class SpatialHash:
+    """
+    Mushroom units grouped in square buckets, to find the units near a cell without looking at all of them.
+
+    Every unit closer than bucket_size to a cell is in the bucket of the cell or in one of the 8 around it. The
+    bucket of every unit is kept by id, so moving a unit does not depend on its position, which players can change.
+    """
+
+    __slots__ = ("bucket_size", "_buckets", "_unit_keys")
+
+    def __init__(self, bucket_size: int):
+        self.bucket_size: int = bucket_size
+        self._buckets: dict[tuple[int, int], list[MushroomUnit]] = dict()
+        self._unit_keys: dict[int, tuple[int, int]] = dict()
+
+    def add(self, unit: MushroomUnit) -> None:
+        key = self._key(unit.pos)
+        self._unit_keys[unit.id] = key
+        self._buckets.setdefault(key, []).append(unit)
+
+    def move(self, unit: MushroomUnit, dst: Pos) -> None:
+        """
+        Update the bucket of a unit moving to dst.
+        """
+        key = self._key(dst)
+        old = self._unit_keys[unit.id]
+        if key != old:
+            bucket = self._buckets[old]
+            bucket.remove(unit)
+            if not bucket:
+                del self._buckets[old]
+            self._buckets.setdefault(key, []).append(unit)
+            self._unit_keys[unit.id] = key
+
+    def near(self, i: int, j: int) -> Iterator[MushroomUnit]:
+        """
+        Get the units in the 3x3 buckets around a cell, which include every unit closer than bucket_size.
+        """
+        bi, bj = i // self.bucket_size, j // self.bucket_size
+        for ni in (bi - 1, bi, bi + 1):
+            for nj in (bj - 1, bj, bj + 1):
+                yield from self._buckets.get((ni, nj), ())
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._unit_keys.clear()
+
+    def _key(self, pos: Pos) -> tuple[int, int]:
+        return pos.i // self.bucket_size, pos.j // self.bucket_size
+
+
+class UnitIndex:
+    """
+    Index of the mushroom units of a match, by id and by cell.
+
+    Cells are packed as ``i * size + j`` and hold the ids of their units in order of arrival. When a board is given,
+    its occupant plane is kept in sync with the index and holds the first unit of every cell. When a spatial hash is
+    given, it is kept in sync as well. The cell of every unit is kept by id, so a unit always leaves the cell it was
+    indexed on even if a player changed its position.
+    """
+
+    __slots__ = ("size", "units", "spatial", "_cells", "_unit_cells", "_board")
+
+    def __init__(
+        self,
+        size: int = MAP_SIZE,
+        board: Union[Board, SparseBoard, None] = None,
+        spatial: Optional[SpatialHash] = None,
+    ):
+        self.size: int = size
+        self.units: dict[int, MushroomUnit] = dict()
+        self.spatial: Optional[SpatialHash] = spatial
+        self._cells: dict[int, list[int]] = dict()
+        self._unit_cells: dict[int, int] = dict()
+        self._board: Union[Board, SparseBoard, None] = board
+
+    def get(self, id: int) -> Optional[MushroomUnit]:
+        return self.units.get(id)
+
+    def add(self, unit: MushroomUnit) -> None:
+        """
+        Index a new mushroom unit at its current position.
+        """
+        self.units[unit.id] = unit
+        self._enter(unit.id, unit.pos)
+        if self.spatial is not None:
+            self.spatial.add(unit)
+
+    def move(self, unit: MushroomUnit, pos: Pos) -> None:
+        """
+        Move an indexed mushroom unit to a new position.
+
+        Args:
+            unit (MushroomUnit): The mushroom unit, its position is updated.
+            pos (Pos): The new position.
+        """
+        self._leave(unit.id)
+        if self.spatial is not None:
+            self.spatial.move(unit, pos)
+        unit.pos = pos
+        self._enter(unit.id, pos)
+
+    def occupants(self, i: int, j: int) -> list[MushroomUnit]:
+        """
+        Get the mushroom units on a cell, in order of arrival.
+        """
+        return [self.units[id] for id in self._cells.get(i * self.size + j, ())]
+
+    def clear(self) -> None:
+        if self._board is not None:
+            self._board.clear_occupants()
+        if self.spatial is not None:
+            self.spatial.clear()
+        self.units.clear()
+        self._cells.clear()
+        self._unit_cells.clear()
+
+    def _enter(self, id: int, pos: Pos) -> None:
+        cell = pos.i * self.size + pos.j
+        self._unit_cells[id] = cell
+        ids = self._cells.get(cell)
+        if ids is None:
+            self._cells[cell] = [id]
+            if self._board is not None:
+                self._board.set_occupant(pos.i, pos.j, id)
+        else:
+            ids.append(id)
+
+    def _leave(self, id: int) -> None:
+        cell = self._unit_cells.pop(id)
+        ids = self._cells[cell]
+        ids.remove(id)
+        if not ids:
+            del self._cells[cell]
+        if self._board is not None:
+            i, j = divmod(cell, self.size)
+            self._board.set_occupant(i, j, ids[0] if ids else None)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self.units
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def __iter__(self) -> Iterator[MushroomUnit]:
+        return iter(self.units.values())
+
+
+class FoodIndex:
+    """
+    Food grouped in square buckets, to find the food close to a cell in Chebyshev distance (the number of moves in
+    the 8 directions).
+
+    Buckets hold the ids and positions of the food, the food itself is read from the food table, so the index does
+    not change when a food is eaten, only when it is placed or runs out. Queries look at the rings of buckets around
+    the cell, from the inside out, and stop as soon as no bucket further away can hold a closer food.
+    """
+
+    __slots__ = ("size", "bucket_size", "_food", "_buckets")
+
+    def __init__(
+        self, food: Mapping[int, Food], size: int = MAP_SIZE, bucket_size: int = 8
+    ):
+        """
+        Args:
+            food (Mapping[int, Food]): The food table, by id. The food in it is indexed.
+            size (int): The side of the map.
+            bucket_size (int): The side of the buckets.
+        """
+        self.size: int = size
+        self.bucket_size: int = bucket_size
+        self._food: Mapping[int, Food] = food
+        self._buckets: dict[tuple[int, int], dict[int, Pos]] = dict()
+        for f in food.values():
+            self.add(f)
+
+    def add(self, food: Food) -> None:
+        self._buckets.setdefault(self._key(food.pos), {})[food.id] = food.pos
+
+    def remove(self, food: Food) -> None:
+        key = self._key(food.pos)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.pop(food.id, None)
+            if not bucket:
+                del self._buckets[key]
+
+    def nearest(self, i: int, j: int, k: int = 1) -> list[Food]:
+        """
+        Get the k food closest to (i, j), fewer if there is not that much food left.
+
+        Returns:
+            list[Food]: The food sorted by distance, then by id.
+        """
+        found: list[tuple[int, int]] = list()
+        bi, bj = i // self.bucket_size, j // self.bucket_size
+        last_ring = -(-self.size // self.bucket_size)
+        for ring in range(last_ring + 1):
+            found.extend(self._ring(i, j, bi, bj, ring))
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= self._covered(i, j, bi, bj, ring):
+                    break
+        found.sort()
+        return [self._food[id] for _, id in found[:k]]
+
+    def within(self, i: int, j: int, radius: int) -> list[Food]:
+        """
+        Get the food at a distance of at most radius from (i, j).
+
+        Returns:
+            list[Food]: The food sorted by distance, then by id.
+        """
+        found: list[tuple[int, int]] = list()
+        bi, bj = i // self.bucket_size, j // self.bucket_size
+        for ring in range(radius // self.bucket_size + 2):
+            found.extend(
+                (distance, id)
+                for distance, id in self._ring(i, j, bi, bj, ring)
+                if distance <= radius
+            )
+            if self._covered(i, j, bi, bj, ring) >= radius:
+                break
+        found.sort()
+        return [self._food[id] for _, id in found]
+
+    def _ring(
+        self, i: int, j: int, bi: int, bj: int, ring: int
+    ) -> Iterator[tuple[int, int]]:
+        # (distance, id) of the food in the buckets at Chebyshev distance ring from bucket (bi, bj)
+        for ni in range(bi - ring, bi + ring + 1):
+            edge = ni == bi - ring or ni == bi + ring
+            for nj in range(bj - ring, bj + ring + 1, 1 if edge else max(2 * ring, 1)):
+                bucket = self._buckets.get((ni, nj))
+                if bucket:
+                    for id, pos in bucket.items():
+                        yield max(abs(pos.i - i), abs(pos.j - j)), id
+
+    def _covered(self, i: int, j: int, bi: int, bj: int, ring: int) -> int:
+        # Distance up to which every cell around (i, j) lies in the buckets seen so far
+        size = self.bucket_size
+        return min(
+            i - (bi - ring) * size,
+            (bi + ring + 1) * size - 1 - i,
+            j - (bj - ring) * size,
+            (bj + ring + 1) * size - 1 - j,
+        )
+
+    def _key(self, pos: Pos) -> tuple[int, int]:
+        return pos.i // self.bucket_size, pos.j // self.bucket_size
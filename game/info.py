@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-import uuid
-from typing import Union
+from types import MappingProxyType
+from typing import Mapping, Optional, Union
 
 from game.constants import (
     MAP_SIZE,
 )
+from game.fields import DistanceField
+from game.index import FoodIndex, UnitIndex
 from game.utils import Cell, Pos, Food
 
 
@@ -14,13 +16,123 @@ class Info:
     Class containing information that will be available from the point of view of the player, this will be updated
     from the state at each round but will not have any impact on the game itself (this is done in order to avoid
     cheaters).
+
+    The food and the total scores are read-only views of the tables of the state: they are never copied, always show
+    the current round and cannot be modified by the players. Food itself is immutable.
     """
 
     def __init__(self):
         self.players: dict[str, dict[str, Union[int, list[Pos]]]] = dict()
         self.round: int = 0
-        self.food: dict[uuid.UUID, Food] = dict()
-        self.total_score: dict[str, int] = dict()
+        self.map_size: int = MAP_SIZE
+        self._food: dict[int, Food] = dict()
+        self._total_score: dict[str, int] = dict()
+        self._units: UnitIndex = UnitIndex()
+        self._distances: Optional[DistanceField] = None
+        self._food_index: Optional[FoodIndex] = None
+
+    def bind(
+        self, food: dict[int, Food], total_score: dict[str, int], units: UnitIndex
+    ) -> None:
+        """
+        Share the food, score and unit tables of the state with this Info. Only the state should call it.
+
+        Args:
+            food (dict[int, Food]): The food on the board, by id.
+            total_score (dict[str, int]): The score of each player.
+            units (UnitIndex): The mushroom units of every player.
+        """
+        self._food = food
+        self._total_score = total_score
+        self._units = units
+        self._distances = None
+        self._food_index = None
+
+    @property
+    def food(self) -> Mapping[int, Food]:
+        return MappingProxyType(self._food)
+
+    @property
+    def total_score(self) -> Mapping[str, int]:
+        return MappingProxyType(self._total_score)
+
+    @property
+    def distances(self) -> DistanceField:
+        """
+        Distance from every cell to the closest food and the direction to move towards it.
+
+        The field is computed the first time it is used and then kept up to date as food runs out, so it is shared
+        by all the players and units instead of each of them running its own search every round.
+        """
+        if self._distances is None:
+            self._distances = DistanceField.from_sources(
+                ((food.pos.i, food.pos.j) for food in self._food.values()),
+                self.map_size,
+            )
+        return self._distances
+
+    def food_placed(self, food: Food) -> None:
+        """
+        Update the cached views after new food is placed. Only the state should call it.
+        """
+        self._distances = None
+        if self._food_index is not None:
+            self._food_index.add(food)
+
+    def food_finished(self, food: Food) -> None:
+        """
+        Update the cached views after a food runs out. Only the state should call it.
+        """
+        if self._distances is not None:
+            self._distances.remove(food.pos.i, food.pos.j)
+        if self._food_index is not None:
+            self._food_index.remove(food)
+
+    def nearest_food(self, i: int, j: int, k: int = 1) -> list[Food]:
+        """
+        Get the k food closest to a cell, counting the moves in the 8 directions (Chebyshev distance).
+
+        Args:
+            i (int): The row index of the cell.
+            j (int): The column index of the cell.
+            k (int): Number of food to get, fewer are returned if there is not that much food left.
+
+        Returns:
+            list[Food]: The food sorted by distance, then by id.
+        """
+        return self._get_food_index().nearest(i, j, k)
+
+    def food_within(self, i: int, j: int, radius: int) -> list[Food]:
+        """
+        Get the food that can be reached from a cell in at most radius moves.
+
+        Args:
+            i (int): The row index of the cell.
+            j (int): The column index of the cell.
+            radius (int): The maximum number of moves.
+
+        Returns:
+            list[Food]: The food sorted by distance, then by id.
+        """
+        return self._get_food_index().within(i, j, radius)
+
+    def _get_food_index(self) -> FoodIndex:
+        if self._food_index is None:
+            self._food_index = FoodIndex(self._food, self.map_size)
+        return self._food_index
 
     def get_score(self, player_name: str) -> int:
-        return self.total_score[player_name]
+        return self._total_score[player_name]
+
+    def occupants(self, i: int, j: int) -> list[tuple[str, int]]:
+        """
+        Get the mushroom units standing on a cell.
+
+        Args:
+            i (int): The row index of the cell.
+            j (int): The column index of the cell.
+
+        Returns:
+            list[tuple[str, int]]: The (player name, id) of each mushroom unit on the cell, in order of arrival.
+        """
+        return [(unit.player, unit.id) for unit in self._units.occupants(i, j)]
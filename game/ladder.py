@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import math
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from game.cache import ResultCache
+from game.config import MatchConfig
+from game.main import discover_player_classes
+from game.register import Registry
+from game.tournament import (
+    MatchResult,
+    add_cache_arguments,
+    cache_from_arguments,
+    new_pool,
+    play_matches,
+)
+
+PAIRINGS: tuple[str, ...] = ("round-robin", "swiss", "rating")
+
+# Glicko constant q = ln(10) / 400
+_Q: float = math.log(10) / 400
+
+
+@dataclass
+class Rating:
+    """
+    Glicko rating of a player: an Elo rating together with its standard deviation, which shrinks as the player
+    plays and tells how much the rating can still be trusted.
+    """
+
+    rating: float = 1500.0
+    deviation: float = 350.0
+    matches: int = 0
+    points: float = 0.0  # One per game won against an opponent, a half per draw.
+
+    def expected(self, other: Rating) -> float:
+        """
+        Get the expected score of a game against other, 1 being a sure win.
+        """
+        return 1 / (
+            1 + 10 ** (-_g(other.deviation) * (self.rating - other.rating) / 400)
+        )
+
+    def better_than(self, other: Rating) -> float:
+        """
+        Get the probability that the true rating of this player is above the one of other.
+        """
+        spread = math.hypot(self.deviation, other.deviation)
+        if spread == 0:
+            return (
+                0.5
+                if self.rating == other.rating
+                else float(self.rating > other.rating)
+            )
+        return 0.5 * (
+            1 + math.erf((self.rating - other.rating) / (spread * math.sqrt(2)))
+        )
+
+
+def _g(deviation: float) -> float:
+    return 1 / math.sqrt(1 + 3 * _Q**2 * deviation**2 / math.pi**2)
+
+
+def update_ratings(ratings: dict[str, Rating], result: MatchResult) -> None:
+    """
+    Update the ratings of the players of a match with the Glicko rules.
+
+    Every pair of players of the match counts as a game won by the one with more points, a draw if they tie, and all
+    the games of the match are rated from the ratings before it.
+
+    Args:
+        ratings (dict[str, Rating]): The rating of every player, by name. It is updated in place.
+        result (MatchResult): The result of the match.
+    """
+    players = list(result.scores)
+    before = {
+        name: Rating(ratings[name].rating, ratings[name].deviation) for name in players
+    }
+    for name in players:
+        own = before[name]
+        variance_inverse = 0.0
+        change = 0.0
+        points = 0.0
+        for other_name in players:
+            if other_name == name:
+                continue
+            other = before[other_name]
+            difference = result.scores[name] - result.scores[other_name]
+            score = 1.0 if difference > 0 else 0.5 if difference == 0 else 0.0
+            expected = own.expected(other)
+            g = _g(other.deviation)
+            variance_inverse += _Q**2 * g**2 * expected * (1 - expected)
+            change += g * (score - expected)
+            points += score
+        precision = 1 / own.deviation**2 + variance_inverse
+        rating = ratings[name]
+        rating.rating = own.rating + _Q / precision * change
+        rating.deviation = math.sqrt(1 / precision)
+        rating.matches += 1
+        rating.points += points
+
+
+class Ladder:
+    """
+    Ranks players by playing the matches that tell them apart, instead of every pairing many times.
+
+    Every round of the ladder is a set of matches between two players, chosen by the pairing:
+
+    * ``round-robin``: every pair of players plays once per round.
+    * ``swiss``: players are sorted by rating and paired with the closest player they met the fewest times.
+    * ``rating``: only the neighbours in the ranking whose order is not settled yet play, the most uncertain first.
+
+    Ratings are updated as soon as each result comes in. The ladder stops when the ranking has converged: every two
+    neighbours in the ranking are either ordered with the given confidence, or both rated precisely enough (a
+    deviation of at most max_deviation) to call them even.
+    """
+
+    def __init__(
+        self,
+        player_names: list[str],
+        pairing: str = "swiss",
+        seed: int = 1,
+        confidence: float = 0.95,
+        max_deviation: float = 50.0,
+    ):
+        """
+        Args:
+            player_names (list[str]): Names of the registered players to rank.
+            pairing (str): How the players are paired, one of PAIRINGS.
+            seed (int): Seed of the first match, the next ones follow. It also breaks the ties of the pairings.
+            confidence (float): Probability with which two neighbours in the ranking must be ordered.
+            max_deviation (float): Deviation under which the rating of a player is precise enough.
+        """
+        if len(player_names) < 2:
+            raise ValueError("A ladder needs at least two players")
+        if pairing not in PAIRINGS:
+            raise ValueError(f"Unknown pairing {pairing}, use one of {PAIRINGS}")
+        self.pairing: str = pairing
+        self.confidence: float = confidence
+        self.max_deviation: float = max_deviation
+        self.ratings: dict[str, Rating] = {name: Rating() for name in player_names}
+        self.meetings: Counter = Counter()
+        self.rounds: int = 0
+        self._next_seed: int = seed
+        self._rng: random.Random = random.Random(seed)
+
+    def standings(self) -> list[tuple[str, Rating]]:
+        """
+        Get the players from the best rated to the worst.
+        """
+        return sorted(self.ratings.items(), key=lambda item: -item[1].rating)
+
+    def settled(self, first: str, second: str) -> bool:
+        """
+        Check if more matches are not needed to rank two players.
+        """
+        a, b = self.ratings[first], self.ratings[second]
+        if max(a.better_than(b), b.better_than(a)) >= self.confidence:
+            return True
+        return max(a.deviation, b.deviation) <= self.max_deviation
+
+    def converged(self) -> bool:
+        names = [name for name, _ in self.standings()]
+        return all(self.settled(a, b) for a, b in zip(names, names[1:]))
+
+    def pairings(self) -> list[tuple[str, str]]:
+        """
+        Get the matches of the next round.
+        """
+        if self.pairing == "round-robin":
+            pairs = list(itertools.combinations(self.ratings, 2))
+            self._rng.shuffle(pairs)
+            return pairs
+        if self.pairing == "swiss":
+            return self._swiss()
+        return self._by_uncertainty()
+
+    def record(self, result: MatchResult) -> None:
+        update_ratings(self.ratings, result)
+        self.meetings[frozenset(result.scores)] += 1
+
+    def run(
+        self,
+        max_rounds: int = 100,
+        workers: Optional[int] = None,
+        chunksize: int = 1,
+        config: Optional[MatchConfig] = None,
+        cache: Optional[ResultCache] = None,
+    ) -> Iterator[MatchResult]:
+        """
+        Play rounds until the ranking converges or max_rounds rounds are played.
+
+        Args:
+            max_rounds (int): Maximum number of rounds.
+            workers (Optional[int]): Number of worker processes, one per core if None and none (matches played in this
+                process) if 0. The same pool is used by every round.
+            chunksize (int): Number of matches sent to a worker at once.
+            config (Optional[MatchConfig]): Settings of the matches, the defaults of game.constants if None.
+            cache (Optional[ResultCache]): Cache of results, the matches found in it are not played again.
+
+        Yields:
+            MatchResult: The result of each match, after the ratings were updated with it.
+        """
+        pool = new_pool(workers) if workers != 0 else None
+        try:
+            while self.rounds < max_rounds and not self.converged():
+                matches = list()
+                for pair in self.pairings():
+                    matches.append((list(pair), self._next_seed))
+                    self._next_seed += 1
+                if not matches:
+                    break
+                for result in play_matches(matches, pool, chunksize, config, cache):
+                    self.record(result)
+                    yield result
+                self.rounds += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def _ranking(self) -> list[str]:
+        # Ties, such as the first round, are broken at random so that the same players do not always meet
+        names = list(self.ratings)
+        self._rng.shuffle(names)
+        return sorted(names, key=lambda name: -self.ratings[name].rating)
+
+    def _swiss(self) -> list[tuple[str, str]]:
+        pairs = list()
+        unpaired = self._ranking()
+        while len(unpaired) > 1:
+            first = unpaired.pop(0)
+            # The closest player below that was met the fewest times, the last one gets a bye if they are odd
+            k = min(
+                range(len(unpaired)),
+                key=lambda k: (self.meetings[frozenset((first, unpaired[k]))], k),
+            )
+            pairs.append((first, unpaired.pop(k)))
+        return pairs
+
+    def _by_uncertainty(self) -> list[tuple[str, str]]:
+        names = self._ranking()
+        candidates = [
+            (a, b) for a, b in zip(names, names[1:]) if not self.settled(a, b)
+        ]
+        candidates.sort(
+            key=lambda pair: -(
+                self.ratings[pair[0]].deviation + self.ratings[pair[1]].deviation
+            )
+        )
+        pairs = list()
+        busy = set()
+        for a, b in candidates:
+            if a not in busy and b not in busy:
+                pairs.append((a, b))
+                busy.update((a, b))
+        return pairs
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Rank players with as few matches as needed."
+    )
+    parser.add_argument(
+        "--players", nargs="+", help="Players taking part, all by default"
+    )
+    parser.add_argument("--pairing", choices=PAIRINGS, default="swiss")
+    parser.add_argument("--rounds", type=int, default=100, help="Maximum rounds")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the first match")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--max-deviation", type=float, default=50.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=1)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    discover_player_classes()
+    player_names = args.players or list(Registry.registered_players.keys())
+
+    start = time.time()
+    ladder = Ladder(
+        player_names, args.pairing, args.seed, args.confidence, args.max_deviation
+    )
+    results = ladder.run(
+        args.rounds,
+        args.workers,
+        args.chunksize,
+        cache=cache_from_arguments(args),
+    )
+    matches = sum(1 for _ in results)
+    status = "converged" if ladder.converged() else "did not converge"
+    print(f"Ranking {status} after {ladder.rounds} rounds and {matches} matches")
+    for position, (player_name, rating) in enumerate(ladder.standings(), 1):
+        print(
+            f"{position}. {player_name} rating {rating.rating:.0f} +- {rating.deviation:.0f} "
+            f"after {rating.matches} matches"
+        )
+    print(f"time elapsed {time.time()-start}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,11 @@
-import importlib
-import inspect
-import pkgutil
 import time
-from pprint import pprint
+from typing import Optional
 
 import game.player as player
-from game.constants import NUMBER_OF_ROUNDS
-from game.player.player import Player
+from game.config import MatchConfig
+from game.host import PlayerHost
+from game.manifest import LazyPlayer, scan_players
+from game.profiling import Profiler
 from game.register import Registry
 from game.info import Info
 from game.state import State
@@ -14,26 +13,55 @@ from game.state import State
 
 def discover_player_classes():
     """
-    Automatically discover and register all player classes in the player.py file.
+    Automatically discover and register all player classes in the game.player package.
+
+    The classes are found from the cached manifest of the package and registered with lazy factories, so the module
+    of a player is only imported when a match creates it. Players that are already registered are kept.
     """
-    for module_info in pkgutil.iter_modules(
-        path=player.__path__, prefix=player.__name__ + "."
-    ):
-        module = importlib.import_module(module_info.name)
-        for name, obj in inspect.getmembers(module):
-            if inspect.isclass(obj) and issubclass(obj, Player) and obj != Player:
-                # Register the player class if it is a subclass of Player
-                Registry.register_player(obj)
+    for name, module in scan_players(player).items():
+        if name not in Registry.registered_players:
+            Registry.register(name, LazyPlayer(module, name))
 
 
-def run():
-    # Discover and register all player subclasses
-    # Get the list of registered player names from the Registry
-    # Automatically discover and register all player classes
-    discover_player_classes()
-    registered_players = list(Registry.registered_players.keys())
+def play_match(
+    player_names: list[str],
+    seed: Optional[int] = None,
+    output_file: Optional[str] = "output.csv",
+    verbose: bool = True,
+    replay_file: Optional[str] = None,
+    sandbox: bool = False,
+    deadline: float = 1.0,
+    profile: bool = False,
+    config: Optional[MatchConfig] = None,
+) -> State:
+    """
+    Play a full match between the given registered players.
+
+    Args:
+        player_names (list[str]): Names of the registered players taking part in the match.
+        seed (Optional[int]): Seed of the match, a random one is used if None.
+        output_file (Optional[str]): File where the match is saved, nothing is saved if None.
+        verbose (bool): Print the results of the match.
+        replay_file (Optional[str]): File where the binary replay of the match is saved, if any.
+        sandbox (bool): Run each player in its own process, all of them playing concurrently.
+        deadline (float): Seconds the players have to play each round when sandboxed, late commands are dropped.
+        profile (bool): Time each phase of the rounds and each player, the report is printed with the results and
+            kept in state.profiler.
+        config (Optional[MatchConfig]): Settings of the match, the defaults of game.constants if None.
+
+    Returns:
+        State: The state of the game once the match is over.
+    """
     # Create players using the registered names
-    players = [Registry.new_player(name) for name in registered_players]
+    host = None
+    if sandbox:
+        host = PlayerHost(
+            {name: Registry.registered_players[name] for name in player_names},
+            deadline,
+        )
+        players = host.players
+    else:
+        players = [Registry.new_player(name) for name in player_names]
 
     # Create game information available for each player
     info = Info()
@@ -41,22 +69,58 @@ def run():
         player.set_info(info)
 
     # Create the game state
-    state = State(info, players)
+    profiler = Profiler() if profile else None
+    state = State(
+        info,
+        players,
+        seed=seed,
+        output_file=output_file,
+        replay_file=replay_file,
+        profiler=profiler,
+        config=config,
+    )
 
     # Generate initial mushroom units for the players
     state.populate_board()
 
     # Run the fight for a fixed number of rounds
+    if host is not None:
+        host.start(state.seed)
+    try:
+        for round_number in range(state.config.rounds):
+            if host is not None:
+                if profiler is not None:
+                    mark = profiler.mark()
+                host.play_round(state)
+                if profiler is not None:
+                    profiler.lap("play:host", mark)
+            else:
+                for player in players:
+                    if profiler is not None:
+                        mark = profiler.mark()
+                    player.reset()
+                    player.play()
+                    if profiler is not None:
+                        profiler.lap(f"play:{player.name}", mark)
+            # Perform the actions for the next round
+            state.next()
+    finally:
+        if host is not None:
+            host.close()
+
+    state.end_game(verbose=verbose)
+    return state
+
+
+def run():
+    # Discover and register all player subclasses
+    # Get the list of registered player names from the Registry
+    # Automatically discover and register all player classes
+    discover_player_classes()
+    registered_players = list(Registry.registered_players.keys())
+
     start = time.time()
-    for round_number in range(NUMBER_OF_ROUNDS):
-        for player in players:
-            player.reset()
-            player.play()
-        # Perform the actions for the next round
-        state.next()
-
-        # Print the current state after each round
-    state.end_game()
+    play_match(registered_players)
     print(f"time elapsed {time.time()-start}")
 
 
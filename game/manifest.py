@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+from types import ModuleType
+from typing import Optional
+
+from game.player.player import Player
+
+# Bump it when the layout of the manifest changes, older manifests are then ignored
+MANIFEST_VERSION: int = 2
+MANIFEST_FILE: str = "players.json"
+
+
+class LazyPlayer:
+    """
+    Factory of a player class that only imports the module of the class the first time it is called.
+
+    It can be pickled, so it can be sent to the processes of a sandboxed match or a tournament.
+    """
+
+    __slots__ = ("module", "name")
+
+    def __init__(self, module: str, name: str):
+        self.module: str = module
+        self.name: str = name
+
+    def load(self) -> type[Player]:
+        return getattr(importlib.import_module(self.module), self.name)
+
+    def __call__(self) -> Player:
+        return self.load()()
+
+    def __repr__(self) -> str:
+        return f"LazyPlayer({self.module!r}, {self.name!r})"
+
+
+def scan_players(
+    package: ModuleType, manifest_file: Optional[str] = None
+) -> dict[str, str]:
+    """
+    Find the player classes of a package without importing its modules.
+
+    The classes defined at the top level of every module are read from its syntax tree, and the ones that inherit
+    from Player, directly or through other classes of the package, are players. What was read from each module is
+    cached in a manifest together with the mtime, size and SHA-256 of the file, so a module is only read again when
+    its file changes and only parsed again when its content changes. Modules without Python source are imported.
+
+    Args:
+        package (ModuleType): The package holding the players, such as game.player.
+        manifest_file (Optional[str]): The manifest, in the __pycache__ directory of the package if None. Nothing is
+            cached if it cannot be written.
+
+    Returns:
+        dict[str, str]: The name of the module of every player class, by class name.
+    """
+    modules, compiled = _scan(package, manifest_file)
+    players: dict[str, str] = dict()
+    for module_name in compiled:
+        players.update(_inspect_module(module_name))
+
+    # Players of the package can inherit from other players of the package
+    bases = {"Player"}
+    found = True
+    while found:
+        found = False
+        for module, entry in modules.items():
+            for name, class_bases in entry["classes"]:
+                if name not in bases and bases.intersection(class_bases):
+                    bases.add(name)
+                    players.setdefault(name, module)
+                    found = True
+    return players
+
+
+def dependency_hashes(
+    package: ModuleType, module: str, manifest_file: Optional[str] = None
+) -> dict[str, Optional[str]]:
+    """
+    Get the SHA-256 of the source of a module of a package and of the modules of the package it depends on: the
+    ones it imports and the ones defining the classes its classes inherit from, and so on, all read from the same
+    manifest as scan_players.
+
+    Args:
+        package (ModuleType): The package, such as game.player.
+        module (str): The name of the module, such as game.player.dumb_player.
+        manifest_file (Optional[str]): The manifest, in the __pycache__ directory of the package if None.
+
+    Returns:
+        dict[str, Optional[str]]: The hash of every module by name, None for the modules without Python source.
+    """
+    modules, compiled = _scan(package, manifest_file)
+    defined_in: dict[str, list[str]] = dict()
+    for name, entry in modules.items():
+        for class_name, _ in entry["classes"]:
+            defined_in.setdefault(class_name, []).append(name)
+
+    hashes: dict[str, Optional[str]] = dict()
+    pending = [module]
+    while pending:
+        name = pending.pop()
+        if name in hashes:
+            continue
+        entry = modules.get(name)
+        if entry is None:
+            hashes[name] = None
+            continue
+        hashes[name] = entry["sha256"]
+        pending.extend(
+            imported
+            for imported in entry["imports"]
+            if imported in modules or imported in compiled
+        )
+        for _, bases in entry["classes"]:
+            for base in bases:
+                pending.extend(defined_in.get(base, ()))
+    return hashes
+
+
+def _scan(
+    package: ModuleType, manifest_file: Optional[str]
+) -> tuple[dict[str, dict], list[str]]:
+    """
+    Get the manifest entry of every module of a package with Python source and the names of the other modules,
+    saving the manifest if it changed.
+    """
+    if manifest_file is None:
+        manifest_file = os.path.join(package.__path__[0], "__pycache__", MANIFEST_FILE)
+    cached = _read_manifest(manifest_file)
+    modules: dict[str, dict] = dict()
+    compiled: list[str] = list()
+    for module_info in pkgutil.iter_modules(
+        path=package.__path__, prefix=package.__name__ + "."
+    ):
+        path = _source_path(module_info)
+        if path is None:
+            compiled.append(module_info.name)
+        else:
+            modules[module_info.name] = _scan_module(
+                path, cached.get(module_info.name), _package_of(module_info)
+            )
+    if modules != cached:
+        _write_manifest(manifest_file, modules)
+    return modules, compiled
+
+
+def _source_path(module_info: pkgutil.ModuleInfo) -> Optional[str]:
+    directory = getattr(module_info.module_finder, "path", None)
+    if directory is None:
+        return None
+    name = module_info.name.rpartition(".")[2]
+    if module_info.ispkg:
+        path = os.path.join(directory, name, "__init__.py")
+    else:
+        path = os.path.join(directory, name + ".py")
+    return path if os.path.isfile(path) else None
+
+
+def _package_of(module_info: pkgutil.ModuleInfo) -> str:
+    # Relative imports of a package start from the package itself, the ones of a module from its package
+    if module_info.ispkg:
+        return module_info.name
+    return module_info.name.rpartition(".")[0]
+
+
+def _scan_module(path: str, entry: Optional[dict], package_name: str) -> dict:
+    """
+    Get the manifest entry of a module file, reusing the cached entry when the file did not change.
+    """
+    stat = os.stat(path)
+    if (
+        entry is not None
+        and entry["mtime_ns"] == stat.st_mtime_ns
+        and entry["size"] == stat.st_size
+    ):
+        return entry
+    with open(path, "rb") as f:
+        source = f.read()
+    sha256 = hashlib.sha256(source).hexdigest()
+    if entry is not None and entry["sha256"] == sha256:
+        classes, imports = entry["classes"], entry["imports"]
+    else:
+        classes, imports = _read_tree(source, path, package_name)
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": sha256,
+        "classes": classes,
+        "imports": imports,
+    }
+
+
+def _read_tree(
+    source: bytes, path: str, package_name: str
+) -> tuple[list[list], list[str]]:
+    """
+    Get the name and the names of the bases of every class defined at the top level of a module, and the absolute
+    names of the modules it may import. ``from x import y`` gives both x and x.y, since y can be a module.
+    """
+    try:
+        tree = ast.parse(source, path)
+    except SyntaxError:
+        # Importing it fails too, the match will report the error if one of its players is used
+        return [], []
+    classes = list()
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            bases = list()
+            for base in node.bases:
+                if isinstance(base, ast.Name):
+                    bases.append(base.id)
+                elif isinstance(base, ast.Attribute):
+                    bases.append(base.attr)
+            classes.append([node.name, bases])
+
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = package_name.split(".")
+                base = ".".join(parts[: len(parts) - node.level + 1])
+                module = f"{base}.{node.module}" if node.module else base
+            else:
+                module = node.module
+            imports.add(module)
+            imports.update(f"{module}.{alias.name}" for alias in node.names)
+    return classes, sorted(imports)
+
+
+def _inspect_module(module_name: str) -> dict[str, str]:
+    module = importlib.import_module(module_name)
+    return {
+        name: obj.__module__
+        for name, obj in inspect.getmembers(module)
+        if inspect.isclass(obj) and issubclass(obj, Player) and obj != Player
+    }
+
+
+def _read_manifest(manifest_file: str) -> dict[str, dict]:
+    try:
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return dict()
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return dict()
+    return manifest["modules"]
+
+
+def _write_manifest(manifest_file: str, modules: dict[str, dict]) -> None:
+    # Written to a temporary file first, so that concurrent readers never see half a manifest
+    tmp = f"{manifest_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "modules": modules}, f)
+        os.replace(tmp, manifest_file)
+    except OSError:
+        pass
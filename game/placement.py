@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import random
+from typing import Iterable
+
+import numpy as np
+
+
+def dilate(mask: np.ndarray, distance: int) -> np.ndarray:
+    """
+    Grow a boolean mask so that it covers every cell within the given Chebyshev distance of a True cell.
+    """
+    grown = mask.copy()
+    for _ in range(distance):
+        step = grown.copy()
+        step[1:, :] |= grown[:-1, :]
+        step[:-1, :] |= grown[1:, :]
+        step[:, 1:] |= step[:, :-1].copy()
+        step[:, :-1] |= step[:, 1:].copy()
+        grown = step
+    return grown
+
+
+class PoissonDiskSampler:
+    """
+    Picks cells of a square map so that any two of them, and any of them and an obstacle, are further apart than
+    min_distance (Chebyshev distance).
+
+    Accepted cells are stored in a background grid of buckets of side min_distance + 1, so a bucket holds at most
+    one cell and checking a candidate only looks at the 3x3 buckets around it. Buckets are kept in a dict, so the
+    memory of the sampler does not depend on the size of the map. Cells are placed in three phases:
+
+    * Dart throwing: each cell gets a few uniformly random candidates, which spreads them over the whole map.
+    * Bridson fill: once darts start to miss, new cells are grown around the accepted ones, which fills the gaps
+      between them.
+    * Sweep: if the map is still short of cells, every free cell is tried in random order.
+
+    Each accepted cell costs a bounded number of checks, so the first two phases are linear in the number of cells
+    placed. The sweep is linear in the size of the map and uses dense masks, but it only runs when the map is full.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        min_distance: int,
+        obstacles: Iterable[tuple[int, int]] = (),
+        tries: int = 30,
+    ):
+        """
+        Args:
+            size (int): The side of the map.
+            min_distance (int): Cells are placed at a Chebyshev distance greater than this.
+            obstacles (Iterable[tuple[int, int]]): Cells to keep away from, such as food and mushroom units.
+            tries (int): Candidates tried per cell before moving on to the next phase.
+        """
+        self.size: int = size
+        self.min_distance: int = min_distance
+        self.tries: int = tries
+        self._side: int = min_distance + 1
+        self._buckets: dict[tuple[int, int], int] = dict()
+        self._obstacles: dict[tuple[int, int], list[tuple[int, int]]] = dict()
+        for i, j in obstacles:
+            self._obstacles.setdefault((i // self._side, j // self._side), []).append(
+                (i, j)
+            )
+        self.points: list[tuple[int, int]] = list()
+
+    def sample(self, rng: random.Random, count: int) -> list[tuple[int, int]]:
+        """
+        Pick up to count new cells, fewer if the map is full.
+
+        Args:
+            rng (random.Random): The random generator, the same state gives the same cells.
+            count (int): Number of cells to pick.
+
+        Returns:
+            list[tuple[int, int]]: The (i, j) of each cell, in the order they were picked.
+        """
+        start = len(self.points)
+        target = start + count
+        self._throw_darts(rng, target)
+        if len(self.points) < target:
+            self._fill(rng, target, start)
+        if len(self.points) < target:
+            self._sweep(rng, target)
+        return self.points[start:]
+
+    def _throw_darts(self, rng: random.Random, target: int) -> None:
+        while len(self.points) < target:
+            for _ in range(self.tries):
+                i, j = rng.randrange(self.size), rng.randrange(self.size)
+                if self._accept(i, j):
+                    break
+            else:
+                return
+
+    def _fill(self, rng: random.Random, target: int, start: int) -> None:
+        side = self._side
+        span = 4 * side + 1
+        active = list(range(start, len(self.points)))
+        while active and len(self.points) < target:
+            k = rng.randrange(len(active))
+            i, j = self.points[active[k]]
+            for _ in range(self.tries):
+                # Candidates lie in the ring of Chebyshev radius [side, 2 * side] around the cell
+                di, dj = divmod(rng.randrange(span * span), span)
+                di, dj = di - 2 * side, dj - 2 * side
+                if max(abs(di), abs(dj)) >= side and self._accept(i + di, j + dj):
+                    active.append(len(self.points) - 1)
+                    break
+            else:
+                active[k] = active[-1]
+                active.pop()
+
+    def _sweep(self, rng: random.Random, target: int) -> None:
+        taken = np.zeros((self.size, self.size), dtype=bool)
+        for cell in self.points:
+            taken[cell] = True
+        for cells in self._obstacles.values():
+            for cell in cells:
+                taken[cell] = True
+        free = ~dilate(taken, self.min_distance)
+        cells = np.flatnonzero(free).tolist()
+        rng.shuffle(cells)
+        for cell in cells:
+            if len(self.points) >= target:
+                return
+            self._accept(*divmod(cell, self.size))
+
+    def _accept(self, i: int, j: int) -> bool:
+        size = self.size
+        if not (0 <= i < size and 0 <= j < size):
+            return False
+        side, d = self._side, self.min_distance
+        bi, bj = i // side, j // side
+        if (bi, bj) in self._buckets:
+            return False
+        for ni in (bi - 1, bi, bi + 1):
+            for nj in (bj - 1, bj, bj + 1):
+                k = self._buckets.get((ni, nj))
+                if k is not None:
+                    pi, pj = self.points[k]
+                    if abs(pi - i) <= d and abs(pj - j) <= d:
+                        return False
+                for pi, pj in self._obstacles.get((ni, nj), ()):
+                    if abs(pi - i) <= d and abs(pj - j) <= d:
+                        return False
+        self._buckets[bi, bj] = len(self.points)
+        self.points.append((i, j))
+        return True
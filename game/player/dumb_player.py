@@ -1,10 +1,7 @@
 from __future__ import annotations
 
-import random
-import uuid
 from typing import Optional
 
-from game.constants import MAP_SIZE
 from game.player.player import Player
 from game.utils import (
     Dir,
@@ -51,9 +48,9 @@ class DumbPlayer(Player):
         if mushroom:
             pos = mushroom.pos
             # Try to move to a position within the board with a random direction.
-            direction = random.choice(list(Dir))
+            direction = self.rng.choice(list(Dir))
             next_pos = pos + direction
-            if is_valid_position(next_pos):
+            if is_valid_position(next_pos, self.info.map_size):
                 self.execute(MoveCommand(mushroom.id, direction))
 
     def play(self) -> None:
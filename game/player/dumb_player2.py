@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import random
 from typing import Optional
 
 from game.player.player import Player
@@ -38,9 +37,9 @@ class DumbPlayer2(Player):
         if mushroom:
             pos = mushroom.pos
             # Try to move to a position within the board with a random direction.
-            direction = random.choice(list(Dir))
+            direction = self.rng.choice(list(Dir))
             next_pos = pos + direction
-            if is_valid_position(next_pos):
+            if is_valid_position(next_pos, self.info.map_size):
                 self.execute(MoveCommand(mushroom.id, direction))
 
     def play(self) -> None:
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import uuid
+import random
 from abc import ABC, abstractmethod
-from typing import final
-from uuid import UUID
+from typing import Iterable, final
 
 from game.info import Info
 from game.utils import Action, MushroomUnit, BranchCommand, Pos
@@ -21,12 +20,20 @@ class Player(Action, ABC):
         super().__init__()
         self.info = None
         self.name = self.__class__.__name__
-        self.mushrooms: dict[UUID, MushroomUnit] = {}
+        self.mushrooms: dict[int, MushroomUnit] = {}
         self.score: int = 0
+        self.rng: random.Random = random.Random()
 
     def set_info(self, info: Info):
         self.info = info
 
+    def set_rng(self, rng: random.Random):
+        """
+        Set the random stream of this player for the match, use it instead of the random module so that the match
+        can be replayed from its seed.
+        """
+        self.rng = rng
+
     @abstractmethod
     def play(self) -> None:
         """
@@ -70,14 +77,44 @@ class Player(Action, ABC):
         return True
 
     def split(self, mushroom_unit: MushroomUnit) -> bool:
-        if (
+        if not self._pay_split(mushroom_unit):
+            return False
+        self.execute(BranchCommand(mushroom_unit.id))
+        return True
+
+    def split_many(self, mushroom_units: Iterable[MushroomUnit]) -> int:
+        """
+        Split several mushroom units with the same rules as split, without creating a BranchCommand for each of them.
+
+        Args:
+            mushroom_units (Iterable[MushroomUnit]): The mushroom units to split, in order.
+
+        Returns:
+            int: The number of mushroom units that will split, stops at the first one that cannot.
+        """
+        count = 0
+        for mushroom_unit in mushroom_units:
+            if not self._pay_split(mushroom_unit):
+                break
+            self.commands_tried += 1
+            self.batch_splits.append(mushroom_unit.id)
+            self.mushrooms_with_commands.add(mushroom_unit.id)
+            count += 1
+        return count
+
+    def _pay_split(self, mushroom_unit: MushroomUnit) -> bool:
+        """
+        Take the five points a split costs, if the player can split one more mushroom unit this round.
+
+        Returns:
+            bool: True if the split was paid, False if the player cannot split.
+        """
+        if not (
             self.score > 5
             and len(self.mushrooms) < 50
             and self.commands_tried < self.MAX_COMMANDS
         ):
-            self.execute(BranchCommand(mushroom_unit.id))
-            self.score -= 5
-            self.info.players[mushroom_unit.player]["score"] -= 5
-            return True
-        else:
             return False
+        self.score -= 5
+        self.info.players[mushroom_unit.player]["score"] -= 5
+        return True
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+
+# Histograms have one bucket per power of two nanoseconds, bucket b counts the samples in [2^(b-1), 2^b)
+BUCKETS: int = 48
+
+
+class Timer:
+    """
+    Running statistics and log2 histogram of the durations of one phase, in constant memory.
+    """
+
+    __slots__ = ("calls", "total_ns", "max_ns", "histogram")
+
+    def __init__(self):
+        self.calls: int = 0
+        self.total_ns: int = 0
+        self.max_ns: int = 0
+        self.histogram: list[int] = [0] * BUCKETS
+
+    def add(self, ns: int) -> None:
+        self.calls += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.histogram[min(ns.bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, q: float) -> int:
+        """
+        Get an upper bound of the q-th percentile (0-100), the end of the histogram bucket it falls in.
+        """
+        rank = q / 100 * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= rank:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+    def summary(self) -> dict:
+        return {
+            "calls": self.calls,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            "p50_us": self.percentile(50) / 1e3,
+            "p90_us": self.percentile(90) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "max_us": self.max_ns / 1e3,
+            "histogram_ns": {
+                f"<{1 << bucket}": count
+                for bucket, count in enumerate(self.histogram)
+                if count
+            },
+        }
+
+
+class Profiler:
+    """
+    Timers and counters of the phases of a match.
+
+    Profiling is enabled per match by giving a Profiler to the State (and to play_match for the players). Without
+    one, the engine only pays for an ``is not None`` check per phase. Timers use perf_counter_ns and are chained
+    with lap, which records the time since the previous mark and returns a new mark:
+
+        mark = profiler.mark()
+        collect_commands()
+        mark = profiler.lap("collect", mark)
+    """
+
+    def __init__(self):
+        self.timers: dict[str, Timer] = dict()
+        self.counters: dict[str, int] = dict()
+
+    @staticmethod
+    def mark() -> int:
+        return time.perf_counter_ns()
+
+    def lap(self, phase: str, mark: int) -> int:
+        """
+        Record the time elapsed since mark in the timer of a phase.
+
+        Args:
+            phase (str): The name of the phase.
+            mark (int): The perf_counter_ns value when the phase started.
+
+        Returns:
+            int: The current perf_counter_ns value, the mark of the next phase.
+        """
+        now = time.perf_counter_ns()
+        timer = self.timers.get(phase)
+        if timer is None:
+            timer = self.timers[phase] = Timer()
+        timer.add(now - mark)
+        return now
+
+    def count(self, counter: str, n: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def summary(self) -> dict:
+        """
+        Get the statistics of every phase and the counters, as builtin types ready to be dumped as JSON.
+        """
+        return {
+            "phases": {phase: timer.summary() for phase, timer in self.timers.items()},
+            "counters": dict(self.counters),
+        }
+
+    def report(self) -> str:
+        """
+        Format the statistics of every phase as a table, slowest phases first.
+        """
+        lines = [
+            f"{'phase':<24} {'calls':>7} {'total ms':>10} {'mean us':>9} {'p99 us':>9} {'max us':>9}"
+        ]
+        timers = sorted(self.timers.items(), key=lambda item: -item[1].total_ns)
+        for phase, timer in timers:
+            summary = timer.summary()
+            lines.append(
+                f"{phase:<24} {summary['calls']:>7} {summary['total_ms']:>10.2f} {summary['mean_us']:>9.1f} "
+                f"{summary['p99_us']:>9.1f} {summary['max_us']:>9.1f}"
+            )
+        for counter, value in self.counters.items():
+            lines.append(f"{counter:<24} {value:>7}")
+        return "\n".join(lines)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+from typing import Any, Hashable, Mapping, Optional, Union
+
+from game.info import Info
+from game.player.player import Player
+from game.utils import (
+    DIRECTIONS,
+    BranchCommand,
+    Dir,
+    Food,
+    MoveCommand,
+    MushroomUnit,
+    Pos,
+)
+
+# Messages only contain builtin types so that they can be pickled through a pipe or serialized for a socket.
+Update = dict[str, Any]
+Commands = list[tuple]
+
+# Socket messages are JSON documents prefixed by their length
+FRAME = struct.Struct(">I")
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+class FoodTracker:
+    """
+    Computes the changes of the food table between two rounds, so that updates only carry what changed.
+
+    Food is immutable and replaced when its quantity changes, so comparing identities is enough.
+    """
+
+    def __init__(self):
+        self._last: dict[Hashable, Food] = dict()
+
+    def delta(self, food: Mapping[Hashable, Food]) -> tuple[dict, list]:
+        """
+        Get the food that changed since the previous call.
+
+        Args:
+            food (Mapping[Hashable, Food]): The current food table.
+
+        Returns:
+            tuple[dict, list]: The (i, j, quantity) of the new or changed food by id and the ids of the removed food.
+        """
+        changed = {
+            id: (f.pos.i, f.pos.j, f.quantity)
+            for id, f in food.items()
+            if self._last.get(id) is not f
+        }
+        removed = [id for id in self._last if id not in food]
+        self._last = dict(food)
+        return changed, removed
+
+
+def round_update(info: Info, player: Player, food_delta: tuple[dict, list]) -> Update:
+    """
+    Build the per-round update sent to a player running out of process.
+
+    Args:
+        info (Info): The information of the engine.
+        player (Player): The engine-side player the update is for.
+        food_delta (tuple[dict, list]): The changes of the food, see FoodTracker.
+
+    Returns:
+        Update: The round, scores, positions of every player, own units, every unit and food changes.
+    """
+    changed, removed = food_delta
+    return {
+        "round": info.round,
+        "map_size": info.map_size,
+        "score": player.score,
+        "total_score": dict(info.total_score),
+        "players": {
+            name: {
+                "positions": [(pos.i, pos.j) for pos in player_info["positions"]],
+                "score": player_info["score"],
+            }
+            for name, player_info in info.players.items()
+        },
+        "mushrooms": {
+            id: (unit.pos.i, unit.pos.j) for id, unit in player.mushrooms.items()
+        },
+        "units": [
+            (unit.player, unit.id, unit.pos.i, unit.pos.j) for unit in info._units
+        ],
+        "food": changed,
+        "food_removed": removed,
+    }
+
+
+def apply_update(player: Player, info: Info, update: Update) -> None:
+    """
+    Apply an update on the player side, rebuilding its Info and mushroom units.
+    """
+    info.round = update["round"]
+    info.map_size = update["map_size"]
+    info._total_score.clear()
+    info._total_score.update(update["total_score"])
+    info.players = {
+        name: {
+            "positions": [Pos(i, j) for i, j in player_info["positions"]],
+            "score": player_info["score"],
+        }
+        for name, player_info in update["players"].items()
+    }
+    for id in update["food_removed"]:
+        food = info._food.pop(id, None)
+        if food is not None:
+            info.food_finished(food)
+    for id, (i, j, quantity) in update["food"].items():
+        food = Food(id=id, quantity=quantity, pos=Pos(i, j))
+        if id not in info._food:
+            info.food_placed(food)
+        info._food[id] = food
+    info._units.clear()
+    for player_name, id, i, j in update["units"]:
+        info._units.add(MushroomUnit(id=id, player=player_name, pos=Pos(i, j)))
+    player.score = update["score"]
+    player.mushrooms = {
+        id: MushroomUnit(id=id, player=player.name, pos=Pos(i, j))
+        for id, (i, j) in update["mushrooms"].items()
+    }
+
+
+def encode_commands(player: Player) -> Commands:
+    """
+    Get the commands requested by a player as tuples of builtin types.
+    """
+    commands = list()
+    for command in player.commands_to_perform:
+        if isinstance(command, MoveCommand):
+            commands.append(("move", command.id, command.dir.name))
+        elif isinstance(command, BranchCommand):
+            commands.append(("split", command.id))
+    for ids, codes in player.batch_moves:
+        for id, code in zip(ids, codes.tolist()):
+            commands.append(("move", id, DIRECTIONS[code].name))
+    for id in player.batch_splits:
+        commands.append(("split", id))
+    return commands
+
+
+def decode_command(command: tuple) -> Optional[Union[MoveCommand, BranchCommand]]:
+    """
+    Rebuild a command sent by a player, None if it is malformed.
+    """
+    try:
+        if command[0] == "move":
+            return MoveCommand(command[1], Dir[command[2]])
+        if command[0] == "split":
+            return BranchCommand(command[1])
+    except (IndexError, KeyError, TypeError):
+        pass
+    return None
+
+
+def apply_commands(player: Player, commands: Commands) -> None:
+    """
+    Replay the commands received from a player on its engine-side stand-in.
+
+    The player cannot be trusted, so commands are checked on the engine side: units have to belong to the player,
+    splits go through Player.split (which checks and charges the score) and the MAX_COMMANDS limit is enforced.
+    Anything invalid is dropped.
+    """
+    for encoded in commands:
+        command = decode_command(encoded)
+        try:
+            if command is None or command.id not in player.mushrooms:
+                continue
+        except TypeError:  # unhashable id
+            continue
+        if isinstance(command, BranchCommand):
+            player.split(player.mushrooms[command.id])
+        elif player.commands_tried < player.MAX_COMMANDS:
+            player.execute(command)
+
+
+def jsonable_update(update: Update) -> Update:
+    """
+    Convert the ids of an update to strings, JSON objects only have string keys.
+    """
+    return {
+        **update,
+        "mushrooms": {str(id): pos for id, pos in update["mushrooms"].items()},
+        "units": [(name, str(id), i, j) for name, id, i, j in update["units"]],
+        "food": {str(id): food for id, food in update["food"].items()},
+        "food_removed": [str(id) for id in update["food_removed"]],
+    }
+
+
+async def read_message(reader: asyncio.StreamReader) -> Any:
+    """
+    Read one length-prefixed JSON message.
+
+    Raises:
+        asyncio.IncompleteReadError: If the connection is closed.
+        ValueError: If the message is too big or is not valid JSON.
+    """
+    (size,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if size > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message of {size} bytes is too big")
+    return json.loads(await reader.readexactly(size))
+
+
+async def write_message(writer: asyncio.StreamWriter, message: Any) -> None:
+    """
+    Write one length-prefixed JSON message, waiting if the peer does not keep up.
+    """
+    data = json.dumps(message, separators=(",", ":")).encode()
+    writer.write(FRAME.pack(len(data)) + data)
+    await writer.drain()
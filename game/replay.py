@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+from enum import IntEnum
+from typing import Optional
+
+import numpy as np
+
+from game.sinks import EventSink
+from game.utils import Food, MushroomUnit, Pos
+
+MAGIC = b"ELRP"
+VERSION = 2
+NONE = 0xFFFFFFFF
+
+# Fixed-width record of a replay, the meaning of unit, other, i and j depends on the event (see ReplaySink)
+RECORD = np.dtype(
+    [
+        ("round", "<u4"),
+        ("event", "<u2"),
+        ("player", "<u2"),
+        ("unit", "<u4"),
+        ("other", "<i4"),
+        ("i", "<i4"),
+        ("j", "<i4"),
+    ]
+)
+HEADER = struct.Struct("<4sHH")
+TRAILER = struct.Struct("<QQQ4s")
+
+
+class Event(IntEnum):
+    """
+    Types of the records stored in a replay.
+    """
+
+    PLAYER_SPAWN = 1
+    UNIT_PLACED = 2
+    FOOD_PLACED = 3
+    MOVE = 4
+    SPLIT = 5
+    FOOD_FINISHED = 6
+    SCORE = 7
+    FINAL_SCORE = 8
+
+
+class ReplaySink(EventSink):
+    """
+    Writes a match as a columnar binary replay.
+
+    The file holds a small header, one RECORD per event, the index of the first record of every round and a JSON
+    table with the player names (records refer to players by position in the table). Units and food are stored with
+    their own ids, which are dense integers.
+    The layout of each record is:
+
+    * PLAYER_SPAWN: player.
+    * UNIT_PLACED: player, unit, (i, j) where it is placed.
+    * FOOD_PLACED: unit is the food, other its quantity, (i, j) where it is placed.
+    * MOVE: player, unit, (i, j) the destination.
+    * SPLIT: player, unit, other the new unit, (i, j) where the new unit is placed.
+    * FOOD_FINISHED: unit is the food.
+    * SCORE and FINAL_SCORE: player, other the score, at the end of each round and of the match.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 4096):
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.itemsize))
+        self._chunk: np.ndarray = np.zeros(chunk_size, dtype=RECORD)
+        self._size: int = 0
+        self._written: int = 0
+        self._round: int = 0
+        self._round_offsets: list[int] = list()
+        self._finished: bool = False
+        self._players: dict[str, int] = dict()
+
+    def _player(self, player_name: str) -> int:
+        return self._players.setdefault(player_name, len(self._players))
+
+    def _record(
+        self,
+        event: Event,
+        player: int = 0,
+        unit: int = NONE,
+        other: int = 0,
+        i: int = -1,
+        j: int = -1,
+    ) -> None:
+        self._chunk[self._size] = (self._round, event, player, unit, other, i, j)
+        self._size += 1
+        if self._size == len(self._chunk):
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(self._chunk[: self._size].tobytes())
+        self._written += self._size
+        self._size = 0
+
+    def start_round(self, round: int) -> None:
+        self._round = round
+        self._round_offsets.append(self._written + self._size)
+
+    def player_spawn(self, player_name: str) -> None:
+        self._record(Event.PLAYER_SPAWN, self._player(player_name))
+
+    def unit_placed(self, unit: MushroomUnit) -> None:
+        self._record(
+            Event.UNIT_PLACED,
+            self._player(unit.player),
+            unit.id,
+            i=unit.pos.i,
+            j=unit.pos.j,
+        )
+
+    def food_placed(self, food: Food) -> None:
+        self._record(
+            Event.FOOD_PLACED,
+            unit=food.id,
+            other=food.quantity,
+            i=food.pos.i,
+            j=food.pos.j,
+        )
+
+    def unit_moved(self, unit: MushroomUnit, src: Pos, dst: Pos) -> None:
+        self._record(Event.MOVE, self._player(unit.player), unit.id, i=dst.i, j=dst.j)
+
+    def unit_split(self, unit: MushroomUnit, new: MushroomUnit) -> None:
+        self._record(
+            Event.SPLIT,
+            self._player(unit.player),
+            unit.id,
+            new.id,
+            new.pos.i,
+            new.pos.j,
+        )
+
+    def food_finished(self, food_id: int) -> None:
+        self._record(Event.FOOD_FINISHED, unit=food_id)
+
+    def round_end(self, round: int, scores: dict[str, int]) -> None:
+        for player_name, score in scores.items():
+            self._record(Event.SCORE, self._player(player_name), other=score)
+
+    def final_score(self, player_name: str, score: int) -> None:
+        self._finish()
+        self._record(Event.FINAL_SCORE, self._player(player_name), other=score)
+
+    def _finish(self) -> None:
+        # Close the index of the last round, what comes after are the final scores
+        if not self._finished:
+            self._round_offsets.append(self._written + self._size)
+            self._finished = True
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._finish()
+        self.flush()
+        index_offset = self._file.tell()
+        self._file.write(np.asarray(self._round_offsets, dtype="<u8").tobytes())
+        meta_offset = self._file.tell()
+        meta = {"players": list(self._players)}
+        self._file.write(json.dumps(meta).encode())
+        self._file.write(
+            TRAILER.pack(index_offset, len(self._round_offsets), meta_offset, MAGIC)
+        )
+        self._file.close()
+
+
+class ReplayReader:
+    """
+    Random-access reader of a binary replay, backed by mmap so only the pages of the requested rounds are read.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.itemsize:
+            raise ValueError(f"{path} is not a replay")
+        index_offset, index_count, meta_offset, magic = TRAILER.unpack_from(
+            self._mmap, len(self._mmap) - TRAILER.size
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a complete replay")
+        self.records: np.ndarray = np.frombuffer(
+            self._mmap,
+            dtype=RECORD,
+            count=(index_offset - HEADER.size) // RECORD.itemsize,
+            offset=HEADER.size,
+        )
+        # round_offsets[n] is the first record of round n, the last one is where the final scores start
+        self.round_offsets: np.ndarray = np.frombuffer(
+            self._mmap, dtype="<u8", count=index_count, offset=index_offset
+        )
+        meta = json.loads(self._mmap[meta_offset : len(self._mmap) - TRAILER.size])
+        self.players: list[str] = meta["players"]
+
+    def __len__(self) -> int:
+        """
+        Get the number of rounds of the match.
+        """
+        return len(self.round_offsets) - 1
+
+    def setup(self) -> np.ndarray:
+        """
+        Get the records written before the first round (spawns and food placement).
+        """
+        return self.records[: self.round_offsets[0]]
+
+    def round(self, n: int) -> np.ndarray:
+        """
+        Get the records of round n without reading any of the previous rounds.
+        """
+        if not 0 <= n < len(self):
+            raise IndexError("round out of range")
+        return self.records[self.round_offsets[n] : self.round_offsets[n + 1]]
+
+    def final_scores(self) -> dict[str, int]:
+        final = self.records[self.round_offsets[-1] :]
+        final = final[final["event"] == Event.FINAL_SCORE]
+        return {
+            self.players[player]: int(score)
+            for player, score in zip(final["player"], final["other"])
+        }
+
+    def positions(self, n: int) -> dict[str, tuple[int, int]]:
+        """
+        Get the position of every mushroom unit at the start of round n.
+
+        Returns:
+            dict[str, tuple[int, int]]: The (i, j) position of each unit, keyed by its id.
+        """
+        end = self.round_offsets[n] if n < len(self) else self.round_offsets[-1]
+        records = self.records[:end]
+        placed = records[
+            (records["event"] == Event.UNIT_PLACED) | (records["event"] == Event.MOVE)
+        ]
+        # Keep the last record of every unit
+        units, last = np.unique(placed["unit"][::-1], return_index=True)
+        last = placed[::-1][last]
+        return {
+            str(unit): (int(i), int(j))
+            for unit, i, j in zip(units, last["i"], last["j"])
+        }
+
+    def close(self) -> None:
+        self.records = self.round_offsets = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Record arrays handed out are still alive, the mapping is released with the last of them
+            pass
+
+    def __enter__(self) -> ReplayReader:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+_DIRECTIONS = {(1, 0): ["right"], (-1, 0): ["left"], (0, 1): ["down"], (0, -1): ["up"]}
+
+
+def _directions(di: int, dj: int) -> list[str]:
+    # The visualizer only moves in four directions, diagonal moves are split in two
+    return _DIRECTIONS.get((di, 0), []) + _DIRECTIONS.get((0, dj), [])
+
+
+def export_rounds(
+    reader: ReplayReader, start: int = 0, stop: Optional[int] = None
+) -> dict:
+    """
+    Export rounds [start, stop) of a replay in the format read by the visualizer (viz/rounds.json).
+    """
+    stop = len(reader) if stop is None else min(stop, len(reader))
+    positions = reader.positions(start)
+
+    rounds = dict()
+    for n in range(start, stop):
+        round_info = dict()
+        actions: dict[str, dict[str, list[dict]]] = {p: {} for p in reader.players}
+        for record in reader.round(n):
+            event = Event(int(record["event"]))
+            player_name = reader.players[record["player"]]
+            if event == Event.SCORE:
+                round_info[player_name] = {"score": int(record["other"])}
+            elif event == Event.UNIT_PLACED:
+                unit = str(record["unit"])
+                positions[unit] = (int(record["i"]), int(record["j"]))
+            elif event == Event.MOVE:
+                unit = str(record["unit"])
+                i, j = positions[unit]
+                dst = (int(record["i"]), int(record["j"]))
+                actions[player_name].setdefault(unit, []).extend(
+                    {"type": "move", "direction": direction}
+                    for direction in _directions(dst[0] - i, dst[1] - j)
+                )
+                positions[unit] = dst
+            elif event == Event.SPLIT:
+                unit = str(record["unit"])
+                actions[player_name].setdefault(unit, []).append(
+                    {
+                        "type": "split",
+                        "newCharacter": str(record["other"]),
+                        "owner": player_name,
+                    }
+                )
+        rounds[str(n + 1)] = {"roundInfo": round_info, "playerActions": actions}
+    return rounds
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Export rounds of a replay for the visualizer."
+    )
+    parser.add_argument("replay")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--stop", type=int, default=None)
+    parser.add_argument("--output", default="rounds.json")
+    args = parser.parse_args(argv)
+
+    with ReplayReader(args.replay) as reader:
+        rounds = export_rounds(reader, args.start, args.stop)
+    with open(args.output, "w") as file:
+        json.dump(rounds, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
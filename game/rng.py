@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import random
+from typing import Optional
+
+
+class MatchRandom:
+    """
+    Independent random streams of a single match.
+
+    The engine and every player draw from their own random.Random, derived from the match seed and the name of the
+    stream, so matches played in the same process (or in threads) never share state through the module-level RNG
+    and any of them can be replayed from its seed.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**63)
+        self.seed: int = seed
+        self.engine: random.Random = self.stream("engine")
+
+    def stream(self, name: str) -> random.Random:
+        """
+        Create the random stream with the given name.
+
+        Args:
+            name (str): The name of the stream.
+
+        Returns:
+            random.Random: A generator that only depends on the match seed and the name.
+        """
+        return random.Random(f"{self.seed}/{name}")
+
+    def for_player(self, player_name: str) -> random.Random:
+        return self.stream(f"player/{player_name}")
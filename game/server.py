@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional
+
+from game.constants import NUMBER_OF_ROUNDS
+from game.host import RemotePlayer
+from game.info import Info
+from game.protocol import (
+    Commands,
+    FoodTracker,
+    apply_commands,
+    jsonable_update,
+    read_message,
+    round_update,
+    write_message,
+)
+from game.rng import MatchRandom
+from game.sinks import NullSink
+from game.state import State
+
+
+@dataclass
+class Bot:
+    """
+    A bot connected to the server.
+    """
+
+    name: str
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    # Messages read from the socket, bounded so that a bot flooding the server is slowed down by TCP backpressure
+    inbox: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=4))
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass
+class ServedMatch:
+    """
+    Result of a match played by the server.
+    """
+
+    seed: int
+    scores: dict[str, int]
+    winners: list[str]
+
+
+def _translate(commands: Any, ids: dict[str, Hashable]) -> Commands:
+    """
+    Map the string ids of the commands sent by a bot back to the ids of its units, dropping anything unknown.
+    """
+    translated = list()
+    if not isinstance(commands, list):
+        return translated
+    for command in commands:
+        if (
+            isinstance(command, list)
+            and len(command) >= 2
+            and isinstance(command[1], str)
+            and command[1] in ids
+        ):
+            translated.append((command[0], ids[command[1]], *command[2:]))
+    return translated
+
+
+class MatchServer:
+    """
+    Hosts matches between bots connected through TCP or Unix sockets.
+
+    Bots say hello with their name and wait in a lobby until there are enough of them for a match. Every match runs
+    as a task of the event loop, so one server hosts many matches at the same time. Each round, every bot gets one
+    message with its round update and has round_timeout seconds to answer with its commands, late commands are
+    dropped.
+
+    Messages are length-prefixed JSON documents (see game.protocol):
+
+    * bot -> server: {"type": "hello", "name": ...} once, then {"type": "commands", "round": ..., "commands": [...]}
+      every round, with commands ["move", id, direction name] or ["split", id].
+    * server -> bot: {"type": "start", "name": ..., "seed": ...}, then {"type": "round", ...update} every round and
+      {"type": "end", "scores": ..., "winners": ...}.
+    """
+
+    def __init__(
+        self,
+        players_per_match: int = 2,
+        rounds: int = NUMBER_OF_ROUNDS,
+        round_timeout: float = 1.0,
+        max_matches: int = 256,
+        seed: Optional[int] = None,
+        on_result: Optional[Callable[[ServedMatch], None]] = None,
+    ):
+        """
+        Args:
+            players_per_match (int): Number of bots in each match.
+            rounds (int): Number of rounds of each match.
+            round_timeout (float): Seconds the bots have to send their commands each round.
+            max_matches (int): Maximum number of matches played at the same time, bots wait in the lobby otherwise.
+            seed (Optional[int]): Seed of the first match, the following ones use the next integers.
+            on_result (Optional[Callable[[ServedMatch], None]]): Called with the result of every match.
+        """
+        self.players_per_match: int = players_per_match
+        self.rounds: int = rounds
+        self.round_timeout: float = round_timeout
+        self.results: list[ServedMatch] = list()
+        self._on_result = on_result
+        self._max_matches: int = max_matches
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lobby: list[Bot] = list()
+        self._seeds = itertools.count(MatchRandom(seed).seed)
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0
+    ) -> asyncio.AbstractServer:
+        self._slots = asyncio.Semaphore(self._max_matches)
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        self._slots = asyncio.Semaphore(self._max_matches)
+        return await asyncio.start_unix_server(self._handle, path)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            hello = await asyncio.wait_for(read_message(reader), self.round_timeout)
+            name = str(hello["name"])
+        except Exception:
+            writer.close()
+            return
+        bot = Bot(name, reader, writer)
+        receiving = asyncio.ensure_future(self._receive(bot))
+        self._lobby.append(bot)
+        if len(self._lobby) >= self.players_per_match:
+            bots = self._lobby[: self.players_per_match]
+            del self._lobby[: self.players_per_match]
+            task = asyncio.ensure_future(self._run_match(bots))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        await bot.done.wait()
+        receiving.cancel()
+        writer.close()
+
+    async def _receive(self, bot: Bot) -> None:
+        # Read the socket in its own task, cancelling a read halfway would lose the framing
+        try:
+            while True:
+                await bot.inbox.put(await read_message(bot.reader))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            if bot in self._lobby:
+                # Nobody is waiting for this bot yet
+                self._lobby.remove(bot)
+                bot.done.set()
+            await bot.inbox.put(None)
+
+    async def _run_match(self, bots: list[Bot]) -> None:
+        async with self._slots:
+            try:
+                await self._play_match(bots)
+            finally:
+                for bot in bots:
+                    bot.done.set()
+
+    async def _play_match(self, bots: list[Bot]) -> None:
+        # Sort the bots so that a seed always gives the same match, whatever the order of arrival
+        bots = sorted(bots, key=lambda bot: bot.name)
+        names = [bot.name for bot in bots]
+        for k, bot in enumerate(bots):
+            if names.count(bot.name) > 1:
+                bot.name = f"{bot.name}#{k}"
+        players = [RemotePlayer(bot.name) for bot in bots]
+        info = Info()
+        state = State(info, players, seed=next(self._seeds), sink=NullSink())
+        state.populate_board()
+        for bot in bots:
+            await self._send(
+                bot, {"type": "start", "name": bot.name, "seed": state.seed}
+            )
+
+        food = FoodTracker()
+        for _ in range(self.rounds):
+            food_delta = food.delta(info.food)
+            await asyncio.gather(
+                *(
+                    self._play_round(bot, player, state, food_delta)
+                    for bot, player in zip(bots, players)
+                )
+            )
+            state.next()
+
+        state.end_game(verbose=False)
+        scores, winners = state.results()
+        result = ServedMatch(seed=state.seed, scores=scores, winners=winners)
+        self.results.append(result)
+        if self._on_result is not None:
+            self._on_result(result)
+        for bot in bots:
+            await self._send(bot, {"type": "end", "scores": scores, "winners": winners})
+
+    async def _play_round(
+        self, bot: Bot, player: RemotePlayer, state: State, food_delta: tuple
+    ) -> None:
+        player.set_info(state.info)
+        player.reset()
+        update = jsonable_update(round_update(state.info, player, food_delta))
+        await self._send(bot, {"type": "round", **update})
+
+        loop = asyncio.get_running_loop()
+        end = loop.time() + self.round_timeout
+        while True:
+            try:
+                message = await asyncio.wait_for(bot.inbox.get(), end - loop.time())
+            except asyncio.TimeoutError:
+                return
+            if message is None:
+                # The bot is gone, keep the None for the next rounds
+                bot.inbox.put_nowait(None)
+                return
+            # Answers to previous rounds arrive late and are dropped
+            if isinstance(message, dict) and message.get("round") == state.info.round:
+                ids = {str(id): id for id in player.mushrooms}
+                apply_commands(player, _translate(message.get("commands"), ids))
+                return
+
+    async def _send(self, bot: Bot, message: dict) -> None:
+        try:
+            await asyncio.wait_for(
+                write_message(bot.writer, message), self.round_timeout
+            )
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Host matches between socket bots.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--unix", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--players-per-match", type=int, default=2)
+    parser.add_argument("--round-timeout", type=float, default=1.0)
+    parser.add_argument("--max-matches", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    async def serve() -> None:
+        server = MatchServer(
+            players_per_match=args.players_per_match,
+            round_timeout=args.round_timeout,
+            max_matches=args.max_matches,
+            on_result=lambda result: print(
+                f"Match {result.seed}: {result.scores} winners {result.winners}"
+            ),
+        )
+        if args.unix:
+            listener = await server.start_unix(args.unix)
+        else:
+            listener = await server.start(args.host, args.port)
+        async with listener:
+            await listener.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+from abc import ABC, abstractmethod
+from typing import IO, Hashable, Optional
+
+from game.utils import Food, MushroomUnit, Pos
+
+try:  # Python 3.14+
+    from compression import zstd
+except ImportError:  # pragma: no cover
+    zstd = None
+
+
+class EventSink:
+    """
+    Receives the events of a match as they happen.
+
+    The base class ignores every event, subclasses decide how to store them.
+    """
+
+    def start_round(self, round: int) -> None:
+        pass
+
+    def player_spawn(self, player_name: str) -> None:
+        pass
+
+    def unit_placed(self, unit: MushroomUnit) -> None:
+        pass
+
+    def food_placed(self, food: Food) -> None:
+        pass
+
+    def unit_moved(self, unit: MushroomUnit, src: Pos, dst: Pos) -> None:
+        pass
+
+    def unit_split(self, unit: MushroomUnit, new: MushroomUnit) -> None:
+        pass
+
+    def food_finished(self, food_id: Hashable) -> None:
+        pass
+
+    def round_end(self, round: int, scores: dict[str, int]) -> None:
+        pass
+
+    def final_score(self, player_name: str, score: int) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class NullSink(EventSink):
+    """
+    Drops every event, used when the match does not need to be saved (e.g. tournaments).
+    """
+
+
+class TeeSink(EventSink):
+    """
+    Forwards every event to several sinks.
+    """
+
+    def __init__(self, *sinks: EventSink):
+        self.sinks: tuple[EventSink, ...] = sinks
+
+    def start_round(self, round: int) -> None:
+        for sink in self.sinks:
+            sink.start_round(round)
+
+    def player_spawn(self, player_name: str) -> None:
+        for sink in self.sinks:
+            sink.player_spawn(player_name)
+
+    def unit_placed(self, unit: MushroomUnit) -> None:
+        for sink in self.sinks:
+            sink.unit_placed(unit)
+
+    def food_placed(self, food: Food) -> None:
+        for sink in self.sinks:
+            sink.food_placed(food)
+
+    def unit_moved(self, unit: MushroomUnit, src: Pos, dst: Pos) -> None:
+        for sink in self.sinks:
+            sink.unit_moved(unit, src, dst)
+
+    def unit_split(self, unit: MushroomUnit, new: MushroomUnit) -> None:
+        for sink in self.sinks:
+            sink.unit_split(unit, new)
+
+    def food_finished(self, food_id: Hashable) -> None:
+        for sink in self.sinks:
+            sink.food_finished(food_id)
+
+    def round_end(self, round: int, scores: dict[str, int]) -> None:
+        for sink in self.sinks:
+            sink.round_end(round, scores)
+
+    def final_score(self, player_name: str, score: int) -> None:
+        for sink in self.sinks:
+            sink.final_score(player_name, score)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+class LineSink(EventSink, ABC):
+    """
+    Formats every event as one line of the CSV-ish text format of the matches.
+
+    Subclasses decide where the lines go by implementing write_line.
+    """
+
+    @abstractmethod
+    def write_line(self, line: str) -> None:
+        pass
+
+    def start_round(self, round: int) -> None:
+        self.write_line(f"{round}")
+
+    def player_spawn(self, player_name: str) -> None:
+        self.write_line(f"Player {player_name} spawn units")
+
+    def unit_placed(self, unit: MushroomUnit) -> None:
+        self.write_line(f"Mushroom {unit.id} placed in {unit.pos}")
+
+    def food_placed(self, food: Food) -> None:
+        self.write_line(f"Food {food.id} placed in {food.pos}")
+
+    def unit_moved(self, unit: MushroomUnit, src: Pos, dst: Pos) -> None:
+        self.write_line(f"{unit.player},{unit.id} from {src} to {dst}")
+
+    def unit_split(self, unit: MushroomUnit, new: MushroomUnit) -> None:
+        self.write_line(
+            f"Mushroom {unit.id} splits into two, new mushroom unit:{new.id}"
+        )
+
+    def food_finished(self, food_id: Hashable) -> None:
+        self.write_line(f"Food {food_id} was finished")
+
+    def final_score(self, player_name: str, score: int) -> None:
+        self.write_line(f"Player {player_name} got score {score}")
+
+
+class MemorySink(LineSink):
+    """
+    Keeps the lines of the match in memory.
+    """
+
+    def __init__(self):
+        self.lines: list[str] = list()
+
+    def write_line(self, line: str) -> None:
+        self.lines.append(line)
+
+
+class TextSink(LineSink):
+    """
+    Streams the lines of the match to a file, optionally compressed.
+
+    Lines are buffered and written in chunks of chunk_size lines, so memory stays bounded and everything up to the
+    last chunk is on disk if the match crashes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compression: Optional[str] = None,
+        chunk_size: int = 1024,
+    ):
+        """
+        Args:
+            path (str): The file to write.
+            compression (Optional[str]): One of "gzip", "bz2", "xz" or "zstd" (Python 3.14+). If None, it is guessed
+                from the extension of the path and the file is plain text when the extension is unknown.
+            chunk_size (int): Number of lines buffered before writing them to the file.
+        """
+        self._file: IO[str] = _open(path, compression or _guess_compression(path))
+        self._chunk_size: int = chunk_size
+        self._buffer: list[str] = list()
+
+    def write_line(self, line: str) -> None:
+        self._buffer.append(line)
+        if len(self._buffer) >= self._chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self._buffer.append("")
+        self._file.write("\n".join(self._buffer))
+        self._file.flush()
+        self._buffer.clear()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+
+
+def _guess_compression(path: str) -> Optional[str]:
+    for extension, compression in _EXTENSIONS.items():
+        if path.endswith(extension):
+            return compression
+    return None
+
+
+def _open(path: str, compression: Optional[str]) -> IO[str]:
+    if compression is None:
+        return open(path, "w", newline="")
+    if compression == "gzip":
+        return gzip.open(path, "wt", newline="")
+    if compression == "bz2":
+        return bz2.open(path, "wt", newline="")
+    if compression in ("xz", "lzma"):
+        return lzma.open(path, "wt", newline="")
+    if compression == "zstd":
+        if zstd is None:
+            raise ValueError("zstd compression needs Python 3.14 or newer")
+        return zstd.open(path, "wt", newline="")
+    raise ValueError(f"Unknown compression {compression}")
+
+
+def open_sink(path: Optional[str], compression: Optional[str] = None) -> EventSink:
+    """
+    Create the sink used to save a match.
+
+    Args:
+        path (Optional[str]): The file to write, no log is written if None.
+        compression (Optional[str]): The compression of the file, see TextSink.
+
+    Returns:
+        EventSink: A TextSink writing to path, or a NullSink if path is None.
+    """
+    if path is None:
+        return NullSink()
+    return TextSink(path, compression)
@@ -1,28 +1,29 @@
 from __future__ import annotations
 
 from collections import defaultdict
+from dataclasses import replace
 
+from game.index import SpatialHash, UnitIndex
 from game.info import Info
-import copy
+import math
 import random
-import uuid
-from typing import Tuple, Optional
-
-from game.constants import (
-    MAP_SIZE,
-    MAX_ATTEMPTS,
-    MAX_FOOD,
-    MAX_QUANTITY_OF_FOOD,
-    MIN_DISTANCE_FOOD,
-    MIN_FOOD,
-    MIN_QUANTITY_OF_FOOD,
-    MIN_DISTANCE_SPAWN_SQUARED,
-)
+from typing import Tuple, Optional, Union
+
+import numpy as np
+
+from game.board import Board, SparseBoard
+from game.config import MatchConfig
+from game.profiling import Profiler
+from game.placement import PoissonDiskSampler
 from game.player.player import Player
+from game.rng import MatchRandom
+from game.replay import ReplaySink
+from game.sinks import EventSink, TeeSink, open_sink
 from game.utils import (
-    Cell,
-    CellType,
+    DIRECTIONS,
+    Dir,
     Food,
+    IdAllocator,
     MushroomUnit,
     Pos,
     MoveCommand,
@@ -32,75 +33,216 @@ from game.utils import (
 
 
 class State:
+    # Resolve scoring and food consumption with NumPy instead of walking every mushroom unit twice
+    batched_resolution: bool = True
+
     def __init__(
         self,
         info: Info,
         players: list[Player],
         seed: Optional[int] = None,
-        output_file: str = "output.csv",
+        output_file: Optional[str] = "output.csv",
+        sink: Optional[EventSink] = None,
+        replay_file: Optional[str] = None,
+        profiler: Optional[Profiler] = None,
+        config: Optional[MatchConfig] = None,
     ):
         super().__init__()
-        if seed:
-            random.seed(seed)
+        self.config: MatchConfig = config if config is not None else MatchConfig()
+        self.profiler: Optional[Profiler] = profiler
+        self.random: MatchRandom = MatchRandom(seed)
+        self.seed: int = self.random.seed
+        self._rng: random.Random = self.random.engine
+        for player in players:
+            player.set_rng(self.random.for_player(player.name))
         self.info: Info = info
+        self.info.map_size = self.config.map_size
         self.round: int = 0
         self._players = {player.name: player for player in players}
-        self._food: dict[uuid.UUID, Food] = dict()
-        self._output_file: str = output_file
-        self._output_buffer: list[str] = list()
-        self.grid: list[list[Cell]] = [
-            [Cell(type=CellType.NORMAL) for _ in range(MAP_SIZE)]
-            for _ in range(MAP_SIZE)
-        ]
+        self._food: dict[int, Food] = dict()
+        self._unit_ids: IdAllocator = IdAllocator()
+        self._food_ids: IdAllocator = IdAllocator()
+        self._total_score: dict[str, int] = dict()
+        self.grid: Union[Board, SparseBoard] = self.config.new_board()
+        # Buckets as wide as the spawn distance, so spawn checks only look at the 3x3 buckets around a cell
+        self._spatial: SpatialHash = SpatialHash(
+            math.ceil(math.sqrt(self.config.min_distance_spawn_squared))
+        )
+        self._units: UnitIndex = UnitIndex(
+            self.config.map_size, self.grid, self._spatial
+        )
+        self.info.bind(self._food, self._total_score, self._units)
+        # Mushroom units that moved or were created since info.players was last updated, in order of the changes
+        self._dirty_units: dict[int, None] = dict()
+        # Positions of the mushroom units of every player, info.players gets copies of them
+        self._positions: dict[str, list[Pos]] = dict()
+        # Index of every mushroom unit in the positions of its player
+        self._position_slots: dict[int, int] = dict()
+        if sink is None:
+            sink = open_sink(output_file)
+        if replay_file is not None:
+            sink = TeeSink(sink, ReplaySink(replay_file))
+        self._sink: EventSink = sink
 
     def populate_board(self):
         self._generate_mushroom_units()
         self.update_mushroom_units_info()
         self._place_food()
-        self.info.food = copy.deepcopy(self._food)
-
-    def update_mushroom_units_info(self):
-        new_info = dict()
-        for player in self._players.values():
-            info_per_player = {"positions": [], "score": 0}
-            for mushroom_units in player.mushrooms.values():
-                info_per_player["positions"].append(mushroom_units.pos)
-            info_per_player["score"] += player.score
-            new_info[player.name] = info_per_player
-        self.info.players = new_info
-
-    def end_game(self):
-        self._print_results()
+
+    def update_mushroom_units_info(self, full: bool = False):
+        """
+        Publish the positions and the score of every player in info.players.
+
+        The state keeps the positions of every player up to date in place: only the mushroom units that moved or
+        were created since the last update are written, so the cost depends on the changes of the round and not on
+        the number of units. info.players then gets new dicts and copies of the lists, so whatever a player does with
+        them does not reach the state, the other players or the next rounds, and lists kept from a round never change.
+
+        Args:
+            full (bool): Rebuild the positions, needed when the units were changed without going through the state.
+        """
+        positions = self._positions
+        if full or positions.keys() != self._players.keys():
+            self._position_slots.clear()
+            self._positions = positions = {
+                player_name: self._unit_positions(player)
+                for player_name, player in self._players.items()
+            }
+        else:
+            units = self._units
+            slots = self._position_slots
+            for id in self._dirty_units:
+                mushroom_unit = units.get(id)
+                player_positions = positions[mushroom_unit.player]
+                slot = slots.get(id)
+                if slot is None:
+                    slots[id] = len(player_positions)
+                    player_positions.append(mushroom_unit.pos)
+                else:
+                    player_positions[slot] = mushroom_unit.pos
+            for player_name, player in self._players.items():
+                if len(positions[player_name]) != len(player.mushrooms):
+                    positions[player_name] = self._unit_positions(player)
+        self._dirty_units.clear()
+        self.info.players = {
+            player_name: {
+                "positions": list(positions[player_name]),
+                "score": player.score,
+            }
+            for player_name, player in self._players.items()
+        }
+
+    def _unit_positions(self, player: Player) -> list[Pos]:
+        positions = list()
+        for mushroom_unit in player.mushrooms.values():
+            self._position_slots[mushroom_unit.id] = len(positions)
+            positions.append(mushroom_unit.pos)
+        return positions
+
+    def end_game(self, verbose: bool = True):
+        self._print_results(verbose)
+        if self.profiler is not None and verbose:
+            print(self.profiler.report())
         self._save_game()
 
+    def results(self) -> Tuple[dict[str, int], list[str]]:
+        """
+        Get the final score of each player and the names of the winning players.
+
+        Returns:
+            Tuple[dict[str, int], list[str]]: The score per player name and the names of the players with top score.
+        """
+        scores = {
+            player_name: player.score for player_name, player in self._players.items()
+        }
+        max_score = 0
+        winners: list[str] = list()
+        for player_name, score in scores.items():
+            if score > max_score:
+                max_score = score
+                winners = [player_name]
+            elif score == max_score:
+                winners.append(player_name)
+        return scores, winners
+
     def next(self) -> None:
         """
         Perform the actions to compute the next state for the next round.
         """
-        self._output_buffer.append(f"{self.round}")
+        profiler = self.profiler
+        if profiler is not None:
+            mark = profiler.mark()
+        self._sink.start_round(self.round)
         commands = list()
+        move_ids = list()
+        move_codes = list()
+        split_ids = list()
         for _, player in self._players.items():
             for c in player.commands_to_perform:
                 commands.append(c)
-
-        # Perform the commands using a random order
-        random.shuffle(commands)
-        for command in commands:
-            if isinstance(command, MoveCommand):
-                self._move_mushroom_unit(command)
-            elif isinstance(command, BranchCommand):
-                self._split(command)
-
-        # Update the total score after executing commands
-        self._compute_total_score()
-
-        # Place food on the grid
-        self._update_food()
+            for ids, codes in player.batch_moves:
+                move_ids.extend(ids)
+                move_codes.append(codes)
+            split_ids.extend(player.batch_splits)
+        codes = np.concatenate(move_codes).tolist() if move_codes else []
+        if profiler is not None:
+            mark = profiler.lap("collect", mark)
+
+        # Perform the commands using a random order, batched commands are numbered after the command objects
+        n_commands = len(commands)
+        n_moves = n_commands + len(move_ids)
+        order = list(range(n_moves + len(split_ids)))
+        self._rng.shuffle(order)
+        if profiler is not None:
+            profiler.count("commands_performed", len(order))
+            mark = profiler.lap("shuffle", mark)
+        for k in order:
+            if k < n_commands:
+                command = commands[k]
+                if isinstance(command, MoveCommand):
+                    self._move_mushroom_unit(command.id, command.dir)
+                elif isinstance(command, BranchCommand):
+                    self._split(command.id)
+            elif k < n_moves:
+                self._move_mushroom_unit(
+                    move_ids[k - n_commands], DIRECTIONS[codes[k - n_commands]]
+                )
+            else:
+                self._split(split_ids[k - n_moves])
+        if profiler is not None:
+            mark = profiler.lap("commands", mark)
+
+        if self.batched_resolution:
+            self._resolve_food()
+            if profiler is not None:
+                mark = profiler.lap("resolve_food", mark)
+        else:
+            # Update the total score after executing commands
+            self._compute_total_score()
+            if profiler is not None:
+                mark = profiler.lap("compute_total_score", mark)
+
+            # Place food on the grid
+            self._update_food()
+            if profiler is not None:
+                mark = profiler.lap("update_food", mark)
 
         # update information about players
         self.update_mushroom_units_info()
+        if profiler is not None:
+            mark = profiler.lap("update_info", mark)
+
+        self._sink.round_end(
+            self.round,
+            {
+                player_name: player.score
+                for player_name, player in self._players.items()
+            },
+        )
 
         self._update_round()
+        if profiler is not None:
+            profiler.lap("round_end", mark)
 
     def _compute_total_score(self):
         """
@@ -109,13 +251,10 @@ class State:
         for player_name, player in self._players.items():
             for mushroom_unit in player.mushrooms.values():
                 new_points = 0
-                if (
-                    self.grid[mushroom_unit.pos.i][mushroom_unit.pos.j].type
-                    == CellType.FOOD
-                ):
+                if self.grid.is_food(mushroom_unit.pos.i, mushroom_unit.pos.j):
                     new_points += 1
                 player.score += new_points
-                self.info.total_score[player_name] = player.score
+                self._total_score[player_name] = player.score
 
     def _generate_mushroom_units(self):
         """
@@ -125,89 +264,63 @@ class State:
             player_name,
             player,
         ) in self._players.items():  # Iterate over players
-            self._output_buffer.append(f"Player {player_name} spawn units")
-            # Spawn a new mushroom unit with a random ID and position (Pos())
-            self._spawn(MushroomUnit(id=uuid.uuid4(), player=player_name, pos=Pos()))
-
-    def _place_food(self):
-        """
-        Place food randomly on the grid.
-        """
-        number_of_food = random.randrange(MIN_FOOD, MAX_FOOD)
-        for k in range(number_of_food):
-            is_valid = False
-            n_attempt = 0
-            i, j = -1, -1
-            while n_attempt < MAX_ATTEMPTS and not is_valid:
-                i = random.randrange(0, MAP_SIZE - 1)
-                j = random.randrange(0, MAP_SIZE - 1)
-                is_valid = self._food_valid(i, j)
-            if is_valid:
-                f = Food(
-                    id=uuid.uuid4(),
-                    quantity=random.randint(MIN_QUANTITY_OF_FOOD, MAX_QUANTITY_OF_FOOD),
-                    pos=Pos(i, j),
-                )
-                self._food[f.id] = f
-                cell = Cell(type=CellType.FOOD, food_id=f.id)
-                self.grid[i][j] = cell
-                self._output_buffer.append(f"Food {f.id} placed in {f.pos}")
+            self._sink.player_spawn(player_name)
+            # Spawn a new mushroom unit with a new ID and a random position
+            self._spawn(
+                MushroomUnit(id=self._unit_ids(), player=player_name, pos=Pos())
+            )
 
-    def _food_valid(self, i: int, j: int) -> bool:
+    def _place_food(self, number_of_food: Optional[int] = None):
         """
-        Check if the given position is valid for placing food.
+        Place food randomly on the grid, away from other food and from the mushroom units.
 
         Args:
-            i (int): The row index of the position.
-            j (int): The column index of the position.
-
-        Returns:
-            bool: True if the position is valid, False otherwise.
+            number_of_food (Optional[int]): Number of food to place, a random one between the min_food and max_food
+                of the config if None.
         """
-        for ii in range(
-            max(0, i - MIN_DISTANCE_FOOD),
-            min(MAP_SIZE, i + MIN_DISTANCE_FOOD - 1),
-        ):
-            for jj in range(
-                max(0, j - MIN_DISTANCE_FOOD),
-                min(MAP_SIZE, j + MIN_DISTANCE_FOOD - 1),
-            ):
-                # Check if the cell contains a mushroom unit or food
-                if (
-                    self.grid[ii][jj].mushroom_id is not None
-                    or self.grid[ii][jj].type == CellType.FOOD
-                ):
-                    return False
-        return True
-
-    def _print_results(self):
+        config = self.config
+        if number_of_food is None:
+            number_of_food = self._rng.randrange(config.min_food, config.max_food)
+        sampler = PoissonDiskSampler(
+            config.map_size,
+            config.min_distance_food,
+            obstacles=self.grid.food_cells() + self.grid.occupied_cells(),
+        )
+        for i, j in sampler.sample(self._rng, number_of_food):
+            f = Food(
+                id=self._food_ids(),
+                quantity=self._rng.randint(
+                    config.min_quantity_of_food, config.max_quantity_of_food
+                ),
+                pos=Pos(i, j),
+            )
+            self._food[f.id] = f
+            self.grid.place_food(i, j, f.id, f.quantity)
+            self.info.food_placed(f)
+            self._sink.food_placed(f)
+
+    def _print_results(self, verbose: bool = True):
         """
         Prints the results and the names of the winning players
+        :param verbose: print to stdout, otherwise the results are only logged
         :return:
         """
-        max_score = 0
-        winners: list[str] = list()
-        for player_name, player in self._players.items():
-            print(f"Player {player_name} got score {player.score}")
-            self._output_buffer.append(f"Player {player_name} got score {player.score}")
-            if player.score > max_score:
-                max_score = player.score
-                winners = [player_name]
-            elif player.score == max_score:
-                winners.append(player_name)
-        for winner in winners:
-            print(f"Player {winner} got top score: {max_score}")
-
-    def _split(self, command: BranchCommand):
-        mushroom_unit = self._find_mushroom_unit(command.id)
+        scores, winners = self.results()
+        for player_name, score in scores.items():
+            if verbose:
+                print(f"Player {player_name} got score {score}")
+            self._sink.final_score(player_name, score)
+        if verbose:
+            for winner in winners:
+                print(f"Player {winner} got top score: {scores[winner]}")
+
+    def _split(self, id: int):
+        mushroom_unit = self._units.get(id)
         new = MushroomUnit(
-            id=uuid.uuid4(), player=mushroom_unit.player, pos=mushroom_unit.pos
+            id=self._unit_ids(), player=mushroom_unit.player, pos=mushroom_unit.pos
         )
         self._spawn(new)
-        self.info.players[mushroom_unit.player]["positions"].append(new.pos)
-        self._output_buffer.append(
-            f"Mushroom {mushroom_unit.id} splits into two, new mushroom unit:{new.id}"
-        )
+        self._sink.unit_split(mushroom_unit, new)
 
     def _spawn(self, mushroom_unit: MushroomUnit):
         """
@@ -216,18 +329,18 @@ class State:
         valid_position = False
         attempts = 0
 
-        while not valid_position and attempts < MAX_ATTEMPTS:
+        while not valid_position and attempts < self.config.max_attempts:
+            attempts += 1
             i, j = self._get_random_spawn_position()
             if self._valid_to_spawn(i, j, mushroom_unit.player):
                 valid_position = True
-                self.grid[i][j].mushroom_id = mushroom_unit.id
                 mushroom_unit.pos = Pos(i, j)
                 self._players[mushroom_unit.player].mushrooms[
                     mushroom_unit.id
                 ] = mushroom_unit
-                self._output_buffer.append(
-                    f"Mushroom {mushroom_unit.id} placed in {mushroom_unit.pos}"
-                )
+                self._units.add(mushroom_unit)
+                self._dirty_units[mushroom_unit.id] = None
+                self._sink.unit_placed(mushroom_unit)
 
         if not valid_position:
             raise RuntimeError("Could not find a cell to start mushroom units")
@@ -244,50 +357,37 @@ class State:
         Returns:
             bool: True if it is valid to spawn the mushroom unit at the given position, False otherwise.
         """
-        for player in self._players.values():
-            if player_name != player.name:
-                for mushroom_unit in player.mushrooms.values():
-                    dist_squared = (i - mushroom_unit.pos.i) ** 2 + (
-                        j - mushroom_unit.pos.j
-                    ) ** 2
-                    if dist_squared < MIN_DISTANCE_SPAWN_SQUARED:
-                        return False
+        for mushroom_unit in self._spatial.near(i, j):
+            if player_name != mushroom_unit.player:
+                dist_squared = (i - mushroom_unit.pos.i) ** 2 + (
+                    j - mushroom_unit.pos.j
+                ) ** 2
+                if dist_squared < self.config.min_distance_spawn_squared:
+                    return False
         return True
 
     def _update_round(self):
         self.round += 1
         self.info.round += 1
 
-    def _find_mushroom_unit(self, id: uuid.UUID) -> Optional[MushroomUnit]:
-        mushroom_unit = None
-        for player in self._players.values():
-            mushroom_unit = player.mushrooms.get(id)
-            if mushroom_unit is not None:
-                break
-        return mushroom_unit
-
-    def _move_mushroom_unit(self, command: MoveCommand) -> None:
+    def _move_mushroom_unit(self, id: int, dir: Dir) -> None:
         """
         Move the mushroom unit of a player based on the command.
 
         Args:
-            command (MoveCommand): The command containing the ID of the mushroom unit and the direction to move.
+            id (int): The ID of the mushroom unit to move.
+            dir (Dir): The direction to move.
         """
-        mushroom_unit = self._find_mushroom_unit(command.id)
+        mushroom_unit = self._units.get(id)
         if mushroom_unit is not None:
-            next_pos = mushroom_unit.pos + command.dir
-            if is_valid_position(next_pos):
-                self._output_buffer.append(
-                    f"{mushroom_unit.player},{mushroom_unit.id} from"
-                    f" {mushroom_unit.pos} to "
-                    f"{next_pos}"
-                )
-                mushroom_unit.pos = next_pos
+            next_pos = mushroom_unit.pos + dir
+            if is_valid_position(next_pos, self.config.map_size):
+                self._sink.unit_moved(mushroom_unit, mushroom_unit.pos, next_pos)
+                self._units.move(mushroom_unit, next_pos)
+                self._dirty_units[id] = None
 
     def _save_game(self) -> None:
-        with open(self._output_file, "w", newline="") as file:
-            for row in self._output_buffer:
-                file.write(f"{row}\n")
+        self._sink.close()
 
     def _update_food(self) -> None:
         """
@@ -299,30 +399,93 @@ class State:
         for player_name, player in self._players.items():
             # Check if any player's mushroom unit is at the same position as the food
             for _, mushroom_unit in player.mushrooms.items():
-                cell = self.grid[mushroom_unit.pos.i][mushroom_unit.pos.j]
-                if cell.food_id and cell.type == CellType.FOOD:
+                i, j = mushroom_unit.pos.i, mushroom_unit.pos.j
+                if self.grid.is_food(i, j):
+                    food_id = self.grid.food_id_at(i, j)
                     player.score += 1
-                    self._food[cell.food_id].quantity -= 1
-
-                    # Update information class as well
-                    self.info.total_score[player_name] += 1
-                    self.info.food[cell.food_id].quantity -= 1
+                    food = self._food[food_id]
+                    self._food[food_id] = replace(food, quantity=food.quantity - 1)
+                    self.grid.eat(i, j)
+                    self._total_score[player_name] += 1
 
-                    if self._food[cell.food_id].quantity == 0:
+                    if food.quantity == 1:
                         # Remove the food cell from the grid
-                        self.grid[mushroom_unit.pos.i][
-                            mushroom_unit.pos.j
-                        ].type = CellType.NORMAL
-                        del self._food[cell.food_id]
-                        del self.info.food[cell.food_id]
-                        self._output_buffer.append(f"Food {cell.food_id} was finished")
-
-    @staticmethod
-    def _get_random_spawn_position() -> Tuple[int, int]:
+                        self.grid.remove_food(i, j)
+                        self.info.food_finished(self._food.pop(food_id))
+                        self._sink.food_finished(food_id)
+
+    def _resolve_food(self) -> None:
+        """
+        Batched equivalent of _compute_total_score followed by _update_food.
+
+        The positions of all mushroom units are gathered into arrays once per round and the score increments, food
+        decrements and depleted food are computed in vectorized form. Units keep the order of the per-unit loops
+        (players first, then their mushroom units), so when a food cell has fewer units of food left than units on
+        it, the same units get to eat it.
+        """
+        players = list(self._players.values())
+        counts = [len(player.mushrooms) for player in players]
+        total = sum(counts)
+        if total == 0:
+            return
+        units = [
+            mushroom_unit
+            for player in players
+            for mushroom_unit in player.mushrooms.values()
+        ]
+        ii = np.fromiter((u.pos.i for u in units), dtype=np.intp, count=total)
+        jj = np.fromiter((u.pos.j for u in units), dtype=np.intp, count=total)
+        owner = np.repeat(np.arange(len(players)), counts)
+
+        # One point for every mushroom unit standing on food
+        cells = ii * self.grid.size + jj
+        on_food = np.flatnonzero(self.grid.food_mask(cells))
+        points = np.bincount(owner[on_food], minlength=len(players))
+
+        # Every food cell feeds at most as many units as units of food it has left
+        cells = cells[on_food]
+        order = np.argsort(cells, kind="stable")
+        cells = cells[order]
+        feeders = on_food[order]
+        position = np.arange(len(cells))
+        first_in_cell = np.ones(len(cells), dtype=bool)
+        first_in_cell[1:] = cells[1:] != cells[:-1]
+        rank = position - np.maximum.accumulate(np.where(first_in_cell, position, 0))
+        eats = rank < self.grid.quantities(cells)
+        points += np.bincount(owner[feeders[eats]], minlength=len(players))
+
+        for player, count, new_points in zip(players, counts, points.tolist()):
+            if count:
+                player.score += new_points
+                self._total_score[player.name] = player.score
+
+        fed_cells, eaten = np.unique(cells[eats], return_counts=True)
+        for cell, n in zip(fed_cells.tolist(), eaten.tolist()):
+            i, j = divmod(cell, self.grid.size)
+            self.grid.eat(i, j, n)
+            food_id = self.grid.food_id_at(i, j)
+            food = self._food[food_id]
+            self._food[food_id] = replace(food, quantity=food.quantity - n)
+
+        # The last unit eating from a cell that runs out of food is the one that finishes it
+        last_eater = eats.copy()
+        last_eater[:-1] &= ~(eats[1:] & ~first_in_cell[1:])
+        finished = np.flatnonzero(last_eater & (self.grid.quantities(cells) == 0))
+        for k in finished[np.argsort(feeders[finished], kind="stable")].tolist():
+            i, j = divmod(int(cells[k]), self.grid.size)
+            food_id = self.grid.food_id_at(i, j)
+            self.grid.remove_food(i, j)
+            self.info.food_finished(self._food.pop(food_id))
+            self._sink.food_finished(food_id)
+
+    def _get_random_spawn_position(self) -> Tuple[int, int]:
         """
         Get a random position for mushroom unit spawn.
 
         Returns:
             Tuple[int, int]: A tuple representing the row and column indices for the spawn position.
         """
-        return random.randrange(0, MAP_SIZE - 1), random.randrange(0, MAP_SIZE - 1)
+        map_size = self.config.map_size
+        return self._rng.randrange(0, map_size - 1), self._rng.randrange(
+            0, map_size - 1
+        )
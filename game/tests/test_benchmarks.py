@@ -0,0 +1,57 @@
+import json
+
+from game.benchmarks.engine import main
+
+
+def test_engine_benchmark_writes_a_report(tmp_path):
+    output = tmp_path / "report.json"
+    main(
+        [
+            "--players",
+            "2",
+            "--units",
+            "1",
+            "2",
+            "--food",
+            "5",
+            "--rounds",
+            "1",
+            "--map-sizes",
+            "8",
+            "--output",
+            str(output),
+        ]
+    )
+
+    report = json.loads(output.read_text())
+    results = report["results"]
+    assert [result["units_per_player"] for result in results] == [1, 2]
+    for result in results:
+        assert result["map_size"] == 8
+        assert result["players"] == 2
+        assert result["rounds"] == 1
+        assert result["rounds_per_second"] > 0
+        assert result["peak_memory_bytes"] > 0
+
+
+def test_engine_benchmark_prints_the_report_without_output(capsys):
+    main(
+        [
+            "--players",
+            "2",
+            "--units",
+            "2",
+            "--food",
+            "5",
+            "--rounds",
+            "1",
+            "--map-sizes",
+            "8",
+            "--sparse",
+            "--no-memory",
+        ]
+    )
+
+    (result,) = json.loads(capsys.readouterr().out)["results"]
+    assert result["sparse"]
+    assert "peak_memory_bytes" not in result
@@ -0,0 +1,75 @@
+import numpy as np
+
+from game.board import EMPTY, Board, SparseBoard
+from game.utils import Cell, CellType
+
+
+def test_new_board_is_empty():
+    board = Board(4)
+    assert board.cell_type.shape == (4, 4)
+    assert (board.cell_type == CellType.NORMAL.value).all()
+    assert (board.food == EMPTY).all()
+    assert (board.occupant == EMPTY).all()
+    assert board[1][2] == Cell()
+
+
+def test_place_and_remove_food():
+    board = Board(4)
+    food_id = 4
+    board.place_food(1, 2, food_id, 7)
+
+    assert board.is_food(1, 2)
+    assert board.food_quantity[1, 2] == 7
+    assert board[1][2].food_id == food_id
+    assert board[1][2].type == CellType.FOOD
+
+    board.remove_food(1, 2)
+    assert not board.is_food(1, 2)
+    assert board.food_quantity[1, 2] == 0
+
+
+def test_cell_view_writes_through():
+    board = Board(4)
+    mushroom_id = 7
+    board[3][0].mushroom_id = mushroom_id
+    board[0][3] = Cell(type=CellType.FOOD, food_id=0)
+
+    assert board.occupant[3, 0] == mushroom_id
+    assert board[3][0].food_id is None
+    assert board.cell(0, 3) == Cell(type=CellType.FOOD, food_id=0)
+    assert not board.is_free(0, 4, 0, 4)
+    assert board.is_free(1, 3, 1, 3)
+
+
+def test_rows_behave_like_lists():
+    board = Board(3)
+    assert len(board) == 3
+    assert len(board[0]) == 3
+    assert board[-1][-1] == Cell()
+    assert sum(1 for row in board for _ in row) == 9
+
+
+def test_sparse_board_matches_the_dense_one():
+    dense, sparse = Board(6), SparseBoard(6)
+    for board in (dense, sparse):
+        board.place_food(1, 2, 4, 3)
+        board.place_food(5, 5, 7, 1)
+        board.set_occupant(1, 2, 9)
+        board.set_occupant(0, 0, 10)
+        assert board.eat(5, 5) == 0
+        board.remove_food(5, 5)
+        assert board.eat(1, 2, 2) == 1
+
+    cells = np.array([0, 1 * 6 + 2, 5 * 6 + 5, 35])
+    assert sparse.food_mask(cells).tolist() == dense.food_mask(cells).tolist()
+    assert sparse.quantities(cells).tolist() == dense.quantities(cells).tolist()
+    assert sparse.food_cells() == dense.food_cells() == [(1, 2)]
+    assert sorted(sparse.occupied_cells()) == sorted(dense.occupied_cells())
+    for i in range(6):
+        for j in range(6):
+            assert sparse.cell(i, j) == dense.cell(i, j)
+    assert sparse.is_free(2, 6, 0, 6) and not sparse.is_free(0, 2, 0, 2)
+
+    sparse.clear_occupants()
+    assert sparse.occupied_cells() == []
+    assert sparse.food_id_at(1, 2) == 4
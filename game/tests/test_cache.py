@@ -0,0 +1,171 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+import game.tournament
+from game.cache import ResultCache
+from game.config import MatchConfig
+from game.manifest import LazyPlayer
+from game.player.dumb_player import DumbPlayer
+from game.player.dumb_player2 import DumbPlayer2
+from game.register import Registry
+from game.tournament import play_matches
+
+BOT = """
+from game.player.player import Player
+
+
+class Alpha(Player):
+    def play(self):
+        pass
+
+    @staticmethod
+    def factory():
+        return Alpha()
+"""
+
+
+@pytest.fixture
+def players(monkeypatch):
+    monkeypatch.setattr(
+        Registry,
+        "registered_players",
+        {"DumbPlayer": DumbPlayer, "DumbPlayer2": DumbPlayer2},
+    )
+    return ["DumbPlayer", "DumbPlayer2"]
+
+
+def test_key_follows_players_seed_and_config(players, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = cache.key(players, 1)
+
+    assert key == ResultCache(str(tmp_path)).key(players, 1)
+    assert key == cache.key(players, 1, MatchConfig())
+    assert key != cache.key(players, 2)
+    assert key != cache.key(players[::-1], 1)
+    assert key != cache.key(players, 1, MatchConfig(rounds=10))
+    assert cache.key(["Unknown"], 1) is None
+
+
+def test_key_follows_the_source_of_the_players(tmp_path, monkeypatch):
+    bots = tmp_path / "bots"
+    bots.mkdir()
+    (bots / "__init__.py").write_text("")
+    (bots / "alpha.py").write_text(BOT)
+    (bots / "beta.py").write_text(
+        "from bots.alpha import Alpha\n\n\nclass Beta(Alpha):\n    pass\n"
+    )
+    (bots / "gamma.py").write_text(BOT.replace("Alpha", "Gamma"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    importlib.invalidate_caches()
+    monkeypatch.setattr(
+        Registry,
+        "registered_players",
+        {
+            "Beta": LazyPlayer("bots.beta", "Beta"),
+            "Gamma": LazyPlayer("bots.gamma", "Gamma"),
+        },
+    )
+
+    def key():
+        return ResultCache(str(tmp_path / "cache")).key(["Beta", "Beta"], 1)
+
+    try:
+        first = key()
+        assert first is not None
+        assert "bots.beta" not in sys.modules
+
+        # Editing the player it inherits from is a miss
+        (bots / "alpha.py").write_text(BOT + "\n# Changed\n")
+        second = key()
+        assert second != first
+
+        # Other players and helpers of the package it does not import are not
+        (bots / "gamma.py").write_text(BOT.replace("Alpha", "Gamma") + "\n# Changed\n")
+        (bots / "helpers.py").write_text("SPEED = 2\n")
+        assert key() == second
+
+        # Until it imports them, relatively or not
+        (bots / "beta.py").write_text(
+            "from bots.alpha import Alpha\nfrom . import helpers\n\n\n"
+            "class Beta(Alpha):\n    pass\n"
+        )
+        third = key()
+        assert third != second
+        (bots / "helpers.py").write_text("SPEED = 3\n")
+        assert key() != third
+    finally:
+        for name in [name for name in sys.modules if name.startswith("bots")]:
+            del sys.modules[name]
+
+
+def test_cached_matches_are_not_played_again(players, tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path), replays=True)
+    config = MatchConfig(rounds=20)
+    matches = [(players, seed) for seed in range(1, 4)]
+    played = list(play_matches(matches, config=config, cache=cache))
+
+    assert len(cache) == 3
+    for seed in range(1, 4):
+        replay = cache.replay_path(cache.key(players, seed, config))
+        assert os.path.getsize(replay) > 0
+
+    def play_match(*args, **kwargs):
+        raise AssertionError("played again")
+
+    monkeypatch.setattr(game.tournament, "play_match", play_match)
+    cached = list(play_matches(matches, config=config, cache=cache))
+    assert sorted(cached, key=lambda r: r.seed) == sorted(played, key=lambda r: r.seed)
+
+
+def test_invalid_entries_are_missed(players, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = cache.key(players, 1)
+    cache.put(key, {"seed": 1, "scores": {}, "winners": []})
+    assert cache.get(key) == {"seed": 1, "scores": {}, "winners": []}
+
+    with open(os.path.join(str(tmp_path), key[:2], f"{key}.json"), "w") as f:
+        f.write("{broken")
+    assert cache.get(key) is None
+    assert ResultCache(str(tmp_path), replays=True).get(key) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=10**6)
+    keys = [f"{k:02d}" + "0" * 62 for k in range(4)]
+    for t, key in enumerate(keys):
+        cache.put(key, {"seed": t, "padding": "x" * 200})
+        path = os.path.join(str(tmp_path), key[:2], f"{key}.json")
+        os.utime(path, (t, t))
+    size = cache._entry_size(keys[0])
+
+    # Using the oldest entry makes the second one the least recently used
+    assert cache.get(keys[0]) is not None
+    cache.max_bytes = 4 * size
+    cache.put("04" + "0" * 62, {"seed": 4, "padding": "x" * 200})
+
+    assert len(cache) == 4
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+def test_stale_temporary_files_are_swept(players, tmp_path):
+    cache = ResultCache(str(tmp_path), replays=True)
+    key = cache.key(players, 1)
+    stale = cache.new_replay_file(key)
+    fresh = cache.new_replay_file(key) + ".fresh.tmp"
+    for path in (stale, fresh):
+        with open(path, "wb") as f:
+            f.write(b"x" * 1000)
+    os.utime(stale, (0, 0))
+
+    cache = ResultCache(str(tmp_path), replays=True)
+    assert cache._total_size() == 2000
+    cache.evict()
+
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+    assert cache._total_size() == 1000
@@ -0,0 +1,76 @@
+import tracemalloc
+
+import pytest
+
+from game.config import MatchConfig
+from game.info import Info
+from game.player.dumb_player import DumbPlayer
+from game.player.dumb_player2 import DumbPlayer2
+from game.sinks import MemorySink
+from game.state import State
+from game.utils import Pos, is_valid_position
+
+
+def _play(config, seed=6, rounds=40):
+    info = Info()
+    players = [DumbPlayer(), DumbPlayer2()]
+    for player in players:
+        player.set_info(info)
+    state = State(info, players, seed=seed, sink=MemorySink(), config=config)
+    state.populate_board()
+    for _ in range(rounds):
+        for player in players:
+            player.reset()
+            player.play()
+        state.next()
+    return state
+
+
+def test_is_valid_position_uses_the_map_size():
+    assert is_valid_position(Pos(59, 59))
+    assert not is_valid_position(Pos(60, 0))
+    assert is_valid_position(Pos(60, 0), 61)
+    assert not is_valid_position(Pos(-1, 0), 61)
+
+
+def test_sparse_board_plays_like_the_dense_one():
+    dense = _play(MatchConfig())
+    sparse = _play(MatchConfig(sparse=True))
+
+    assert sparse._sink.lines == dense._sink.lines
+    assert sparse.results() == dense.results()
+    for food in dense._food.values():
+        assert sparse.grid.cell(food.pos.i, food.pos.j) == dense.grid.cell(
+            food.pos.i, food.pos.j
+        )
+
+
+def test_config_sets_the_rules_of_the_match():
+    config = MatchConfig(map_size=30, min_food=10, max_food=11, max_quantity_of_food=5)
+    state = _play(config, rounds=5)
+
+    assert state.info.map_size == 30
+    assert len(state._food) <= 10
+    for food in state._food.values():
+        assert food.quantity <= 5
+        assert is_valid_position(food.pos, 30)
+
+
+def test_spawning_gives_up_after_max_attempts():
+    # Units of other players must start far apart, a 4x4 map has no room for the second one
+    with pytest.raises(RuntimeError):
+        _play(MatchConfig(map_size=4, max_attempts=3), rounds=0)
+
+
+def test_huge_sparse_maps_only_store_what_is_on_them():
+    tracemalloc.start()
+    state = _play(MatchConfig(map_size=10_000, sparse=True), rounds=5)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert state.info.map_size == 10_000
+    assert 300 <= len(state._food) < 500
+    assert peak < 20 * 1024 * 1024
+    for player in state._players.values():
+        for unit in player.mushrooms.values():
+            assert is_valid_position(unit.pos, 10_000)
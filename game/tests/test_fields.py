@@ -0,0 +1,92 @@
+import dataclasses
+import random
+
+import numpy as np
+
+from game.board import EMPTY
+from game.fields import UNREACHABLE, DistanceField
+
+
+def _brute_force(sources, size):
+    ii, jj = np.indices((size, size))
+    distance = np.full((size, size), UNREACHABLE)
+    for i, j in sources:
+        distance = np.minimum(distance, np.maximum(abs(ii - i), abs(jj - j)))
+    return distance
+
+
+def _random_sources(rng, size, n):
+    return rng.sample([(i, j) for i in range(size) for j in range(size)], n)
+
+
+def test_field_matches_chebyshev_distance():
+    rng = random.Random(0)
+    sources = _random_sources(rng, 30, 12)
+    field = DistanceField.from_sources(sources, 30)
+
+    assert (field.distance == _brute_force(sources, 30)).all()
+    for i in range(30):
+        for j in range(30):
+            nearest = field.nearest(i, j)
+            assert (nearest.i, nearest.j) in sources
+            assert max(abs(nearest.i - i), abs(nearest.j - j)) == field.distance[i, j]
+
+
+def test_next_step_gets_closer_to_food():
+    field = DistanceField.from_sources([(3, 17), (25, 4)], 30)
+    for i, j in [(0, 0), (29, 29), (10, 10), (25, 9)]:
+        while field.next_step(i, j) is not None:
+            di, dj = field.next_step(i, j).value
+            assert field.distance[i + di, j + dj] == field.distance[i, j] - 1
+            i, j = i + di, j + dj
+        assert field.distance_at(i, j) == 0
+
+
+def test_removing_food_matches_a_rebuild():
+    rng = random.Random(1)
+    sources = _random_sources(rng, 40, 25)
+    field = DistanceField.from_sources(sources, 40)
+    while sources:
+        i, j = sources.pop(rng.randrange(len(sources)))
+        field.remove(i, j)
+        assert (field.distance == _brute_force(sources, 40)).all()
+        assert ((field.source == EMPTY) == (field.distance == UNREACHABLE)).all()
+    assert field.distance_at(0, 0) is None
+    assert field.next_step(5, 5) is None
+
+
+def test_info_distances_follow_the_match():
+    from game.info import Info
+    from game.player.dumb_player import DumbPlayer
+    from game.player.dumb_player2 import DumbPlayer2
+    from game.sinks import NullSink
+    from game.state import State
+
+    info = Info()
+    players = [DumbPlayer(), DumbPlayer2()]
+    for player in players:
+        player.set_info(info)
+    state = State(info, players, seed=2, sink=NullSink())
+    state.populate_board()
+    # Make food run out quickly
+    for food_id, food in list(state._food.items()):
+        state._food[food_id] = dataclasses.replace(food, quantity=1)
+        state.grid.food_quantity[food.pos.i, food.pos.j] = 1
+    field = info.distances
+    info.nearest_food(0, 0)
+    n_food = len(info.food)
+    for _ in range(30):
+        for player in players:
+            player.reset()
+            player.play()
+        state.next()
+
+    assert len(info.food) < n_food
+    assert info.distances is field
+    positions = [(food.pos.i, food.pos.j) for food in info.food.values()]
+    assert (field.distance == _brute_force(positions, 60)).all()
+    assert {food.id for food in info.food_within(30, 30, 60)} == set(info.food)
+    nearest = info.nearest_food(10, 10)[0]
+    assert max(abs(nearest.pos.i - 10), abs(nearest.pos.j - 10)) == field.distance_at(
+        10, 10
+    )
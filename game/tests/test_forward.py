@@ -0,0 +1,154 @@
+import dataclasses
+
+import pytest
+
+from game.forward import ForwardModel
+from game.info import Info
+from game.player.player import Player
+from game.sinks import MemorySink
+from game.state import State
+from game.utils import DIRECTIONS, BranchCommand, MoveCommand
+
+
+class Mover(Player):
+    def play(self) -> None:
+        for unit in self.mushrooms.values():
+            self.execute(MoveCommand(unit.id, self.rng.choice(DIRECTIONS)))
+
+    @staticmethod
+    def factory():
+        return Mover()
+
+
+class OtherMover(Mover):
+    @staticmethod
+    def factory():
+        return OtherMover()
+
+
+@pytest.fixture
+def state():
+    info = Info()
+    players = [Mover(), OtherMover()]
+    for player in players:
+        player.set_info(info)
+    state = State(info, players, seed=11, sink=MemorySink())
+    state.populate_board()
+    for _ in range(5):
+        _play(state)
+        state.next()
+    return state
+
+
+def _play(state):
+    commands = dict()
+    for player in state._players.values():
+        player.reset()
+        player.play()
+        commands[player.name] = list(player.commands_to_perform)
+    return commands
+
+
+def _view(model_or_state):
+    if isinstance(model_or_state, ForwardModel):
+        info = model_or_state.info
+        scores = model_or_state.scores()
+    else:
+        info = model_or_state.info
+        scores = {name: p.score for name, p in model_or_state._players.items()}
+    units = sorted((u.id, u.player, u.pos.i, u.pos.j) for u in info._units)
+    return scores, units, dict(info.food), info.round
+
+
+def test_step_follows_the_rules_of_the_engine(state):
+    model = ForwardModel.from_info(state.info, seed=1)
+    assert _view(model) == _view(state)
+    for _ in range(10):
+        commands = _play(state)
+        state.next()
+        model.step(commands)
+        assert _view(model) == _view(state)
+
+
+def test_undo_and_restore_go_back(state):
+    model = ForwardModel.from_info(state.info, seed=1)
+    start = _view(model)
+    root = model.snapshot()
+    rounds = [_play(state) for _ in range(3)]
+    for commands in rounds:
+        model.step(commands)
+    after = _view(model)
+
+    model.undo()
+    model.undo()
+    model.undo()
+    assert _view(model) == start
+    with pytest.raises(IndexError):
+        model.undo()
+
+    model.restore(root)
+    for commands in rounds:
+        model.step(commands)
+    assert _view(model) == after
+
+
+def test_undo_brings_back_finished_food(state):
+    model = ForwardModel.from_info(state.info, seed=1)
+    snapshot = model.snapshot()
+    food = snapshot.food.copy()
+    units = snapshot.units.copy()
+    food[0, 3] = 1
+    units[0, 2:] = food[0, 1:3]
+    model.restore(dataclasses.replace(snapshot, food=food, units=units))
+    id, i, j, _ = food[0].tolist()
+    assert model.info.distances.distance_at(i, j) == 0
+
+    model.step()
+    assert id not in model.info.food
+    assert model.info.nearest_food(i, j)[0].id != id
+    assert model.info.distances.distance_at(i, j) > 0
+
+    model.undo()
+    assert model.info.food[id].quantity == 1
+    assert model.info.nearest_food(i, j)[0].id == id
+    assert model.info.distances.distance_at(i, j) == 0
+
+
+def test_same_seed_replays_the_same_rounds(state):
+    model = ForwardModel.from_info(state.info, seed=1)
+    unit = next(iter(model.mushrooms("Mover").values()))
+    model.info.players["Mover"]["score"] = 100
+    model._players["Mover"].score = 100
+    root = model.snapshot()
+
+    model.step({"Mover": [BranchCommand(unit.id)]})
+    split = _view(model)
+    assert model.scores()["Mover"] == 95
+    assert len(model.mushrooms("Mover")) == 2
+
+    model.restore(root)
+    model.step({"Mover": [BranchCommand(unit.id)]})
+    assert _view(model) == split
+
+
+def test_fork_is_independent(state):
+    model = ForwardModel.from_info(state.info, seed=1)
+    fork = model.fork(seed=2)
+    before = _view(model)
+    fork.step(_play(state))
+    fork.step(_play(state))
+
+    assert _view(model) == before
+    assert fork.round == model.round + 2
+
+
+def test_model_does_not_touch_the_match(state):
+    rng_state = state._rng.getstate()
+    real = _view(state)
+    model = ForwardModel.from_info(state.info, seed=1)
+    for _ in range(5):
+        model.step(_play(state))
+
+    assert state._rng.getstate() == rng_state
+    assert _view(state) == real
+    assert model.info is not state.info
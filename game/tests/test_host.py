@@ -0,0 +1,75 @@
+import time
+
+from game.host import PlayerHost
+from game.info import Info
+from game.main import play_match
+from game.player.dumb_player import DumbPlayer
+from game.player.dumb_player2 import DumbPlayer2
+from game.player.player import Player
+from game.register import Registry
+from game.sinks import NullSink
+from game.state import State
+from game.utils import Dir, MoveCommand
+
+
+class SlowPlayer(Player):
+    def play(self) -> None:
+        time.sleep(0.5)
+        for mushroom in self.mushrooms.values():
+            self.execute(MoveCommand(mushroom.id, Dir.EAST))
+
+    @staticmethod
+    def factory():
+        return SlowPlayer()
+
+
+class CheaterPlayer(Player):
+    def play(self) -> None:
+        # Try to move the units of the other players
+        for player_info in self.info.players.values():
+            for pos in player_info["positions"]:
+                self.execute(MoveCommand(pos, Dir.EAST))
+
+    @staticmethod
+    def factory():
+        return CheaterPlayer()
+
+
+def test_sandboxed_match_matches_in_process_match(monkeypatch):
+    monkeypatch.setattr(
+        Registry,
+        "registered_players",
+        {"DumbPlayer": DumbPlayer, "DumbPlayer2": DumbPlayer2},
+    )
+    names = ["DumbPlayer", "DumbPlayer2"]
+    in_process = play_match(names, seed=11, output_file=None, verbose=False)
+    sandboxed = play_match(
+        names, seed=11, output_file=None, verbose=False, sandbox=True, deadline=10
+    )
+    assert sandboxed.results() == in_process.results()
+
+
+def test_late_commands_are_dropped():
+    host = PlayerHost({"DumbPlayer": DumbPlayer, "SlowPlayer": SlowPlayer}, 0.1)
+    info = Info()
+    state = State(info, host.players, seed=1, sink=NullSink())
+    state.populate_board()
+    host.start(state.seed)
+    try:
+        start = time.monotonic()
+        host.play_round(state)
+        assert time.monotonic() - start < 0.4
+        dumb, slow = host.players
+        assert dumb.commands_to_perform
+        assert slow.commands_to_perform == []
+    finally:
+        host.close()
+
+
+def test_commands_on_other_units_are_dropped():
+    with PlayerHost({"DumbPlayer": DumbPlayer, "CheaterPlayer": CheaterPlayer}) as host:
+        state = State(Info(), host.players, seed=1, sink=NullSink())
+        state.populate_board()
+        host.start(state.seed)
+        host.play_round(state)
+        assert host.players[1].commands_to_perform == []
@@ -0,0 +1,131 @@
+import random
+
+from game.board import EMPTY, Board
+from game.index import FoodIndex, SpatialHash, UnitIndex
+from game.utils import Food, MushroomUnit, Pos
+
+
+def test_index_tracks_units_by_id_and_cell():
+    board = Board(4)
+    index = UnitIndex(4, board)
+    first = MushroomUnit(0, "a", Pos(1, 1))
+    second = MushroomUnit(1, "b", Pos(1, 1))
+    index.add(first)
+    index.add(second)
+
+    assert index.get(1) is second
+    assert 2 not in index
+    assert index.occupants(1, 1) == [first, second]
+    assert board.occupant[1, 1] == 0
+
+    index.move(first, Pos(2, 3))
+    assert first.pos == Pos(2, 3)
+    assert index.occupants(1, 1) == [second]
+    assert index.occupants(2, 3) == [first]
+    assert board.occupant[1, 1] == 1
+    assert board.occupant[2, 3] == 0
+
+    index.move(second, Pos(2, 3))
+    assert index.occupants(1, 1) == []
+    assert board.occupant[1, 1] == EMPTY
+    assert len(index) == 2
+
+
+def test_units_whose_position_was_changed_by_a_player_still_move():
+    from game.info import Info
+    from game.player.player import Player
+    from game.sinks import NullSink
+    from game.state import State
+    from game.utils import Dir, MoveCommand
+
+    class Wanderer(Player):
+        def play(self) -> None:
+            for unit in self.mushrooms.values():
+                unit.pos += Dir.EAST
+                self.execute(MoveCommand(unit.id, Dir.SOUTH))
+
+        @staticmethod
+        def factory():
+            return Wanderer()
+
+    info = Info()
+    player = Wanderer()
+    player.set_info(info)
+    state = State(info, [player], seed=4, sink=NullSink())
+    state.populate_board()
+    for _ in range(3):
+        player.reset()
+        player.play()
+        state.next()
+
+    for unit in player.mushrooms.values():
+        assert info.occupants(unit.pos.i, unit.pos.j) == [("Wanderer", unit.id)]
+        assert unit in state._spatial.near(unit.pos.i, unit.pos.j)
+    assert len(state._units._cells) == len(player.mushrooms)
+
+
+def test_spatial_hash_finds_every_close_unit():
+    rng = random.Random(2)
+    spatial = SpatialHash(5)
+    index = UnitIndex(60, spatial=spatial)
+    for id in range(200):
+        index.add(MushroomUnit(id, "a", Pos(rng.randrange(60), rng.randrange(60))))
+    for unit in list(index):
+        index.move(unit, Pos(rng.randrange(60), rng.randrange(60)))
+
+    for i, j in [(0, 0), (30, 31), (59, 12), (44, 59)]:
+        near = {unit.id for unit in spatial.near(i, j)}
+        close = {
+            unit.id
+            for unit in index
+            if (unit.pos.i - i) ** 2 + (unit.pos.j - j) ** 2 < 25
+        }
+        assert close <= near
+
+
+def test_info_occupants_follow_the_match():
+    from game.info import Info
+    from game.player.dumb_player import DumbPlayer
+    from game.player.dumb_player2 import DumbPlayer2
+    from game.sinks import NullSink
+    from game.state import State
+
+    info = Info()
+    players = [DumbPlayer(), DumbPlayer2()]
+    for player in players:
+        player.set_info(info)
+    state = State(info, players, seed=5, sink=NullSink())
+    state.populate_board()
+    for _ in range(10):
+        for player in players:
+            player.reset()
+            player.play()
+        state.next()
+
+    for player in players:
+        for id, unit in player.mushrooms.items():
+            assert (player.name, id) in info.occupants(unit.pos.i, unit.pos.j)
+    occupied = sum(len(info.occupants(i, j)) for i in range(60) for j in range(60))
+    assert occupied == sum(len(player.mushrooms) for player in players)
+
+
+def _chebyshev(food, i, j):
+    return max(abs(food.pos.i - i), abs(food.pos.j - j))
+
+
+def test_food_index_queries_match_a_full_scan():
+    rng = random.Random(3)
+    cells = rng.sample([(i, j) for i in range(60) for j in range(60)], 150)
+    food = {id: Food(id, 5, Pos(i, j)) for id, (i, j) in enumerate(cells)}
+    index = FoodIndex(food, 60, bucket_size=7)
+    for id in range(0, 150, 3):
+        index.remove(food.pop(id))
+
+    for _ in range(50):
+        i, j = rng.randrange(60), rng.randrange(60)
+        by_distance = sorted(food.values(), key=lambda f: (_chebyshev(f, i, j), f.id))
+        assert index.nearest(i, j, 5) == by_distance[:5]
+        assert index.within(i, j, 9) == [
+            f for f in by_distance if _chebyshev(f, i, j) <= 9
+        ]
+    assert len(index.nearest(0, 0, 1000)) == len(food)
@@ -0,0 +1,107 @@
+import pytest
+
+from game.config import MatchConfig
+from game.ladder import Ladder, Rating, update_ratings
+from game.player.player import Player
+from game.register import Registry
+from game.tournament import MatchResult
+from game.utils import MoveCommand
+
+
+class Idle(Player):
+    def play(self) -> None:
+        pass
+
+    @staticmethod
+    def factory():
+        return Idle()
+
+
+class OtherIdle(Idle):
+    @staticmethod
+    def factory():
+        return OtherIdle()
+
+
+class Forager(Player):
+    def play(self) -> None:
+        for unit in self.mushrooms.values():
+            step = self.info.distances.next_step(unit.pos.i, unit.pos.j)
+            if step is not None:
+                self.execute(MoveCommand(unit.id, step))
+
+    @staticmethod
+    def factory():
+        return Forager()
+
+
+class OtherForager(Forager):
+    @staticmethod
+    def factory():
+        return OtherForager()
+
+
+@pytest.fixture
+def players(monkeypatch):
+    registered = {cls.__name__: cls for cls in (Idle, OtherIdle, Forager, OtherForager)}
+    monkeypatch.setattr(Registry, "registered_players", registered)
+    return list(registered)
+
+
+def test_ratings_move_towards_the_results():
+    ratings = {"a": Rating(), "b": Rating()}
+    update_ratings(ratings, MatchResult(seed=1, scores={"a": 3, "b": 1}, winners=["a"]))
+
+    assert ratings["a"].rating > 1500 > ratings["b"].rating
+    assert ratings["a"].rating - 1500 == pytest.approx(1500 - ratings["b"].rating)
+    assert ratings["a"].deviation < 350
+    assert ratings["a"].points == 1 and ratings["b"].points == 0
+
+    # A draw against a weaker player costs rating
+    rating = ratings["a"].rating
+    update_ratings(ratings, MatchResult(seed=2, scores={"a": 0, "b": 0}, winners=[]))
+    assert ratings["a"].rating < rating
+    assert ratings["b"].matches == 2
+
+
+def test_draws_between_equals_only_shrink_the_deviation():
+    ratings = {"a": Rating(), "b": Rating()}
+    update_ratings(
+        ratings, MatchResult(seed=1, scores={"a": 2, "b": 2}, winners=["a", "b"])
+    )
+    assert ratings["a"].rating == ratings["b"].rating == 1500
+    assert ratings["a"].deviation < 350
+
+
+@pytest.mark.parametrize("pairing", ["round-robin", "swiss", "rating"])
+def test_ladder_ranks_the_players_and_stops(players, pairing):
+    ladder = Ladder(players, pairing=pairing, seed=3, max_deviation=150)
+    results = list(ladder.run(max_rounds=40, workers=0, config=MatchConfig(rounds=30)))
+
+    assert ladder.converged()
+    assert ladder.rounds < 40
+    assert (
+        len(results) == sum(rating.matches for rating in ladder.ratings.values()) // 2
+    )
+    top = {name for name, _ in ladder.standings()[:2]}
+    assert top == {"Forager", "OtherForager"}
+
+
+def test_swiss_avoids_rematches(players):
+    ladder = Ladder(players, pairing="swiss", seed=3)
+    first = ladder.pairings()
+    for a, b in first:
+        ladder.record(MatchResult(seed=0, scores={a: 1, b: 1}, winners=[a, b]))
+
+    second = ladder.pairings()
+    assert len(second) == 2
+    assert not {frozenset(pair) for pair in first} & {
+        frozenset(pair) for pair in second
+    }
+
+
+def test_ladder_needs_two_players():
+    with pytest.raises(ValueError):
+        Ladder(["Idle"])
+    with pytest.raises(ValueError):
+        Ladder(["Idle", "Forager"], pairing="knockout")
@@ -0,0 +1,131 @@
+import importlib
+import json
+import pickle
+import sys
+
+import pytest
+
+import game.player
+from game.main import discover_player_classes
+from game.manifest import (
+    MANIFEST_VERSION,
+    LazyPlayer,
+    dependency_hashes,
+    scan_players,
+)
+from game.player.dumb_player import DumbPlayer
+from game.register import Registry
+
+BOT = """
+from game.player.player import Player
+
+
+class {name}(Player):
+    def play(self):
+        pass
+
+    @staticmethod
+    def factory():
+        return {name}()
+
+
+class Helper:
+    pass
+"""
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / "bots"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (root / "alpha.py").write_text(BOT.format(name="Alpha"))
+    (root / "beta.py").write_text(
+        "from bots.alpha import Alpha\n\n\nclass Beta(Alpha):\n    pass\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module("bots")
+    for name in [name for name in sys.modules if name.startswith("bots")]:
+        del sys.modules[name]
+
+
+def test_players_are_found_without_importing_them(package, tmp_path):
+    manifest = tmp_path / "players.json"
+    players = scan_players(package, str(manifest))
+
+    assert players == {"Alpha": "bots.alpha", "Beta": "bots.beta"}
+    assert "bots.alpha" not in sys.modules
+    assert "bots.beta" not in sys.modules
+    assert set(json.loads(manifest.read_text())["modules"]) == {
+        "bots.alpha",
+        "bots.beta",
+    }
+
+
+def test_unchanged_modules_are_not_parsed_again(package, tmp_path, monkeypatch):
+    manifest = str(tmp_path / "players.json")
+    scan_players(package, manifest)
+
+    def parse(*args, **kwargs):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr("game.manifest.ast.parse", parse)
+    assert scan_players(package, manifest) == {
+        "Alpha": "bots.alpha",
+        "Beta": "bots.beta",
+    }
+
+    # Touching a file only hashes it again
+    (tmp_path / "bots" / "alpha.py").write_text(BOT.format(name="Alpha"))
+    assert scan_players(package, manifest)["Alpha"] == "bots.alpha"
+
+
+def test_changed_modules_are_parsed_again(package, tmp_path):
+    manifest = str(tmp_path / "players.json")
+    scan_players(package, manifest)
+    (tmp_path / "bots" / "beta.py").write_text(BOT.format(name="Gamma"))
+
+    assert scan_players(package, manifest) == {
+        "Alpha": "bots.alpha",
+        "Gamma": "bots.beta",
+    }
+
+
+def test_dependencies_are_the_imported_and_inherited_modules(package, tmp_path):
+    manifest = str(tmp_path / "players.json")
+    (tmp_path / "bots" / "gamma.py").write_text(BOT.format(name="Gamma"))
+
+    assert set(dependency_hashes(package, "bots.beta", manifest)) == {
+        "bots.alpha",
+        "bots.beta",
+    }
+    assert set(dependency_hashes(package, "bots.gamma", manifest)) == {"bots.gamma"}
+
+
+def test_broken_manifest_is_rebuilt(package, tmp_path):
+    manifest = tmp_path / "players.json"
+    manifest.write_text("{not json")
+
+    assert scan_players(package, str(manifest))["Beta"] == "bots.beta"
+    assert json.loads(manifest.read_text())["version"] == MANIFEST_VERSION
+
+
+def test_lazy_player_imports_on_first_call(package):
+    factory = pickle.loads(pickle.dumps(LazyPlayer("bots.beta", "Beta")))
+    assert "bots.beta" not in sys.modules
+
+    player = factory()
+    assert type(player).__name__ == "Beta"
+    assert player.name == "Beta"
+
+
+def test_discovered_players_are_registered_lazily(monkeypatch):
+    monkeypatch.setattr(Registry, "registered_players", {"DumbPlayer": DumbPlayer})
+    discover_player_classes()
+
+    assert Registry.registered_players["DumbPlayer"] is DumbPlayer
+    factory = Registry.registered_players["DumbPlayer2"]
+    assert isinstance(factory, LazyPlayer)
+    assert factory.module == "game.player.dumb_player2"
+    assert type(Registry.new_player("DumbPlayer2")).__name__ == "DumbPlayer2"
+    assert scan_players(game.player)["DumbPlayer"] == "game.player.dumb_player"
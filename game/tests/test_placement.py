@@ -0,0 +1,46 @@
+import random
+
+import numpy as np
+
+from game.placement import PoissonDiskSampler, dilate
+
+
+def _min_separation(points):
+    points = np.asarray(points)
+    distances = np.abs(points[:, None, :] - points[None, :, :]).max(axis=2)
+    np.fill_diagonal(distances, np.iinfo(distances.dtype).max)
+    return distances.min()
+
+
+def test_dilate_uses_chebyshev_distance():
+    mask = np.zeros((7, 7), dtype=bool)
+    mask[3, 3] = True
+    grown = dilate(mask, 2)
+    assert grown[1:6, 1:6].all()
+    assert grown.sum() == 25
+
+
+def test_sampled_cells_are_separated_and_avoid_obstacles():
+    obstacles = [(10, 10), (30, 5), (31, 5)]
+    points = PoissonDiskSampler(40, 2, obstacles).sample(random.Random(0), 80)
+    assert len(points) == 80
+    assert _min_separation(points) > 2
+    for obstacle in obstacles:
+        assert _min_separation(points + [obstacle]) > 2
+
+
+def test_full_maps_are_filled_up_to_their_capacity():
+    sampler = PoissonDiskSampler(20, 1)
+    points = sampler.sample(random.Random(1), 1000)
+    assert _min_separation(points) > 1
+
+    # No free cell is left: every cell is next to a sampled one
+    taken = np.zeros((20, 20), dtype=bool)
+    taken[tuple(zip(*points))] = True
+    assert dilate(taken, 1).all()
+
+
+def test_sampling_is_deterministic():
+    first = PoissonDiskSampler(100, 1).sample(random.Random(4), 2000)
+    second = PoissonDiskSampler(100, 1).sample(random.Random(4), 2000)
+    assert first == second
@@ -1,5 +1,3 @@
-import uuid
-
 import pytest
 
 from game.player.player import Player
@@ -35,7 +33,7 @@ def test_set_info(player):
 
 
 def test_reset(player):
-    mushroom = MushroomUnit(id=uuid.uuid4(), player="dummy", pos=Pos(1, 1))
+    mushroom = MushroomUnit(id=0, player="dummy", pos=Pos(1, 1))
     # add a command to commands to perform
     player.execute(MoveCommand(mushroom.id, Dir.EAST))
     assert player.commands_to_perform == [MoveCommand(mushroom.id, Dir.EAST)]
@@ -59,3 +57,20 @@ def test_winning(player):
     info._total_score["DummyPlayer"] = 20
 
     assert player.winning()
+
+
+def test_split_and_split_many_share_the_cost(player):
+    info = Info()
+    player.set_info(info)
+    info.players = {"DummyPlayer": {"positions": [], "score": 12}}
+    player.score = 12
+    units = [MushroomUnit(id=k, player="DummyPlayer", pos=Pos(1, 1)) for k in range(3)]
+    player.mushrooms = {unit.id: unit for unit in units}
+
+    assert player.split(units[0])
+    assert player.split_many(units[1:]) == 1
+    assert player.score == 2
+    assert info.players["DummyPlayer"]["score"] == 2
+    assert player.commands_tried == 2
+    assert player.batch_splits == [1]
+    assert not player.split(units[2])
@@ -0,0 +1,46 @@
+from game.profiling import Timer
+
+
+def test_timer_histogram_and_percentiles():
+    timer = Timer()
+    for ns in [100] * 90 + [5000] * 9 + [70000]:
+        timer.add(ns)
+
+    assert timer.calls == 100
+    assert timer.max_ns == 70000
+    assert timer.percentile(50) == 128
+    assert timer.percentile(99) == 8192
+    assert timer.percentile(100) == 70000
+    assert timer.summary()["histogram_ns"] == {"<128": 90, "<8192": 9, "<131072": 1}
+
+
+def test_profiled_match_times_every_phase_and_player(monkeypatch):
+    from game.main import play_match
+    from game.player.dumb_player import DumbPlayer
+    from game.player.dumb_player2 import DumbPlayer2
+    from game.register import Registry
+
+    monkeypatch.setattr(
+        Registry,
+        "registered_players",
+        {"DumbPlayer": DumbPlayer.factory, "DumbPlayer2": DumbPlayer2.factory},
+    )
+    names = ["DumbPlayer", "DumbPlayer2"]
+    plain = play_match(names, seed=4, output_file=None, verbose=False)
+    profiled = play_match(names, seed=4, output_file=None, verbose=False, profile=True)
+
+    assert plain.profiler is None
+    assert plain.results() == profiled.results()
+    summary = profiled.profiler.summary()
+    for phase in [
+        "collect",
+        "shuffle",
+        "commands",
+        "resolve_food",
+        "update_info",
+        "play:DumbPlayer",
+        "play:DumbPlayer2",
+    ]:
+        assert summary["phases"][phase]["calls"] == 150
+    assert summary["counters"]["commands_performed"] > 0
+    assert "resolve_food" in profiled.profiler.report()
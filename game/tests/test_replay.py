@@ -0,0 +1,72 @@
+import pytest
+
+from game.info import Info
+from game.player.dumb_player import DumbPlayer
+from game.player.dumb_player2 import DumbPlayer2
+from game.replay import Event, ReplayReader, export_rounds
+from game.sinks import MemorySink
+from game.state import State
+
+
+@pytest.fixture
+def replay(tmp_path):
+    info = Info()
+    players = [DumbPlayer(), DumbPlayer2()]
+    for player in players:
+        player.set_info(info)
+    sink = MemorySink()
+    path = str(tmp_path / "match.replay")
+    state = State(info, players, seed=5, sink=sink, replay_file=path)
+    state.populate_board()
+    for _ in range(30):
+        for player in players:
+            player.reset()
+            player.play()
+        state.next()
+    state.end_game(verbose=False)
+    with ReplayReader(path) as reader:
+        yield reader, state, sink.lines
+
+
+def test_replay_rounds_match_text_log(replay):
+    reader, state, lines = replay
+    assert len(reader) == 30
+    assert reader.players == ["DumbPlayer", "DumbPlayer2"]
+
+    moves = [line for line in lines if " from " in line]
+    records = reader.records[reader.records["event"] == Event.MOVE]
+    assert len(records) == len(moves)
+    for record, line in zip(records, moves):
+        assert line.endswith(f"to ({record['i']}, {record['j']})")
+        assert f",{record['unit']} from " in line
+
+
+def test_replay_random_access(replay):
+    reader, state, _ = replay
+    round_ten = reader.round(10)
+    assert (round_ten["round"] == 10).all()
+    assert reader.round(29)["round"].max() == 29
+    with pytest.raises(IndexError):
+        reader.round(30)
+
+    final = reader.positions(len(reader))
+    units = {
+        str(unit.id): (unit.pos.i, unit.pos.j)
+        for player in state._players.values()
+        for unit in player.mushrooms.values()
+    }
+    assert final == units
+    assert reader.final_scores() == state.results()[0]
+
+
+def test_export_rounds(replay):
+    reader, state, _ = replay
+    rounds = export_rounds(reader, start=28)
+    assert list(rounds) == ["29", "30"]
+    assert set(rounds["30"]["roundInfo"]) == {"DumbPlayer", "DumbPlayer2"}
+    assert (
+        rounds["30"]["roundInfo"]["DumbPlayer"]["score"]
+        == state.results()[0]["DumbPlayer"]
+    )
+    actions = rounds["29"]["playerActions"]["DumbPlayer"]
+    assert all(action["type"] == "move" for unit in actions.values() for action in unit)
@@ -0,0 +1,82 @@
+import asyncio
+
+from game.client import run_bot
+from game.main import play_match
+from game.player.dumb_player import DumbPlayer
+from game.player.dumb_player2 import DumbPlayer2
+from game.register import Registry
+from game.protocol import read_message, write_message
+from game.server import MatchServer
+
+
+async def _serve(server, clients, path=None):
+    if path is None:
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+    else:
+        listener = await server.start_unix(path)
+        port = None
+    async with listener:
+        results = await asyncio.gather(
+            *(run_bot(factory, port=port, path=path) for factory in clients)
+        )
+    return results
+
+
+def test_server_plays_like_in_process_match(monkeypatch):
+    monkeypatch.setattr(
+        Registry,
+        "registered_players",
+        {"DumbPlayer": DumbPlayer, "DumbPlayer2": DumbPlayer2},
+    )
+    expected = play_match(
+        ["DumbPlayer", "DumbPlayer2"], seed=21, output_file=None, verbose=False
+    ).results()
+
+    server = MatchServer(seed=21, round_timeout=10)
+    results = asyncio.run(_serve(server, [DumbPlayer2, DumbPlayer]))
+
+    assert [(r.scores, r.winners) for r in server.results] == [expected]
+    assert all(result["scores"] == expected[0] for result in results)
+
+
+def test_server_hosts_concurrent_matches_over_unix_socket(tmp_path):
+    server = MatchServer(rounds=10, seed=1)
+    clients = [DumbPlayer, DumbPlayer2] * 8
+    results = asyncio.run(_serve(server, clients, path=str(tmp_path / "server.sock")))
+
+    assert len(server.results) == 8
+    assert sorted(result.seed for result in server.results) == list(range(1, 9))
+    assert all(
+        set(result["scores"]) == {"DumbPlayer", "DumbPlayer2"} for result in results
+    )
+
+
+async def _silent_bot(port):
+    """A bot that never answers the rounds."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    await write_message(writer, {"type": "hello", "name": "SilentBot"})
+    rounds = 0
+    while True:
+        message = await read_message(reader)
+        if message["type"] == "round":
+            rounds += 1
+        elif message["type"] == "end":
+            writer.close()
+            return rounds, message
+
+
+def test_silent_bots_do_not_block_the_match():
+    async def serve():
+        server = MatchServer(rounds=5, round_timeout=0.05, seed=1)
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            return server, await asyncio.gather(
+                run_bot(DumbPlayer, port=port), _silent_bot(port)
+            )
+
+    server, (result, (rounds, end)) = asyncio.run(serve())
+    assert rounds == 5
+    assert len(server.results) == 1
+    assert set(end["scores"]) == {"DumbPlayer", "SilentBot"}
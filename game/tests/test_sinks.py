@@ -0,0 +1,82 @@
+import gzip
+import zlib
+
+import pytest
+
+from game.sinks import LineSink, MemorySink, NullSink, TextSink, open_sink
+from game.utils import Food, MushroomUnit, Pos
+
+
+def _write_events(sink):
+    unit = MushroomUnit(id=1, player="DumbPlayer", pos=Pos(1, 2))
+    sink.start_round(0)
+    sink.unit_moved(unit, Pos(1, 2), Pos(2, 2))
+    sink.food_placed(Food(id=2, quantity=5, pos=Pos(3, 3)))
+    sink.final_score("DumbPlayer", 4)
+
+
+EXPECTED = [
+    "0",
+    "DumbPlayer,1 from (1, 2) to (2, 2)",
+    "Food 2 placed in (3, 3)",
+    "Player DumbPlayer got score 4",
+]
+
+
+def test_memory_sink_keeps_text_format():
+    sink = MemorySink()
+    _write_events(sink)
+    assert sink.lines == EXPECTED
+
+
+@pytest.mark.parametrize("name", ["match.csv", "match.csv.gz", "match.csv.bz2"])
+def test_text_sink_roundtrip(tmp_path, name):
+    path = str(tmp_path / name)
+    sink = TextSink(path)
+    _write_events(sink)
+    sink.close()
+
+    with open_text(path) as file:
+        assert file.read().splitlines() == EXPECTED
+
+
+def test_text_sink_flushes_in_chunks(tmp_path):
+    path = str(tmp_path / "match.csv.gz")
+    sink = TextSink(path, chunk_size=2)
+    _write_events(sink)
+
+    # Nothing is closed yet but the full chunks can already be decompressed
+    with open(path, "rb") as file:
+        data = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(file.read())
+    assert data.decode().splitlines() == EXPECTED
+    sink.close()
+
+
+def test_open_sink_without_path_drops_events():
+    sink = open_sink(None)
+    assert isinstance(sink, NullSink)
+    _write_events(sink)
+    sink.close()
+
+
+def test_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        TextSink(str(tmp_path / "match.csv"), compression="rar")
+
+
+def open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    if path.endswith(".bz2"):
+        import bz2
+
+        return bz2.open(path, "rt")
+    return open(path)
+
+
+def test_line_sinks_must_write_lines():
+    class Forgetful(LineSink):
+        pass
+
+    with pytest.raises(TypeError):
+        Forgetful()
@@ -0,0 +1,223 @@
+import copy
+import dataclasses
+import random
+
+import pytest
+
+from game.info import Info
+from game.player.player import Player
+from game.sinks import MemorySink
+from game.state import State
+from game.utils import DIRECTIONS, Dir, MoveCommand, MushroomUnit, Pos
+
+
+class PlayerA(Player):
+    def play(self) -> None:
+        pass
+
+    @staticmethod
+    def factory():
+        return PlayerA()
+
+
+class PlayerB(Player):
+    def play(self) -> None:
+        pass
+
+    @staticmethod
+    def factory():
+        return PlayerB()
+
+
+@pytest.fixture
+def state():
+    info = Info()
+    players = [PlayerA(), PlayerB()]
+    for player in players:
+        player.set_info(info)
+    state = State(info, players, seed=3, sink=MemorySink())
+    state.populate_board()
+    return state
+
+
+def _crowd_food(state, rng, units_per_player=30):
+    """Move every mushroom unit onto a handful of food cells so that they compete for it."""
+    food_positions = [food.pos for food in state._food.values()][:5]
+    for player in state._players.values():
+        while len(player.mushrooms) < units_per_player:
+            unit = MushroomUnit(id=state._unit_ids(), player=player.name, pos=Pos())
+            player.mushrooms[unit.id] = unit
+        for unit in player.mushrooms.values():
+            pos = rng.choice(food_positions + [Pos(0, 0)])
+            unit.pos = Pos(pos.i, pos.j)
+
+
+def test_batched_resolution_matches_per_unit_loop(state):
+    rng = random.Random(0)
+    for _ in range(20):
+        _crowd_food(state, rng)
+        reference = copy.deepcopy(state)
+
+        reference._compute_total_score()
+        reference._update_food()
+        state._resolve_food()
+
+        assert {n: p.score for n, p in state._players.items()} == {
+            n: p.score for n, p in reference._players.items()
+        }
+        assert state.info.total_score == reference.info.total_score
+        assert state._food == reference._food
+        assert state.info.food == reference.info.food
+        assert (state.grid.cell_type == reference.grid.cell_type).all()
+        assert (state.grid.food_quantity == reference.grid.food_quantity).all()
+        assert state._sink.lines == reference._sink.lines
+
+
+def test_next_advances_round(state):
+    state.next()
+    assert state.round == 1
+    assert state.info.round == 1
+
+
+def _new_match(seed):
+    from game.player.dumb_player import DumbPlayer
+    from game.player.dumb_player2 import DumbPlayer2
+
+    info = Info()
+    players = [DumbPlayer(), DumbPlayer2()]
+    for player in players:
+        player.set_info(info)
+    state = State(info, players, seed=seed, sink=MemorySink())
+    state.populate_board()
+    return state, players
+
+
+def _play_round(state, players):
+    for player in players:
+        player.reset()
+        player.play()
+    state.next()
+
+
+def test_interleaved_matches_are_reproducible():
+    first, first_players = _new_match(7)
+    other, other_players = _new_match(8)
+    for _ in range(20):
+        _play_round(first, first_players)
+        _play_round(other, other_players)
+        random.random()
+
+    replay, replay_players = _new_match(7)
+    for _ in range(20):
+        _play_round(replay, replay_players)
+
+    assert replay._sink.lines == first._sink.lines
+    assert first.results() == replay.results()
+    assert first.seed == 7
+
+
+def test_info_food_is_a_read_only_view(state):
+    food_id, food = next(iter(state.info.food.items()))
+    assert state.info.food == state._food
+
+    with pytest.raises(TypeError):
+        state.info.food[food_id] = food
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        food.quantity = 100
+
+    # Consuming food replaces it in the engine, the view follows and old snapshots stay untouched
+    unit = next(iter(state._players["PlayerA"].mushrooms.values()))
+    unit.pos = Pos(food.pos.i, food.pos.j)
+    state._resolve_food()
+    assert state.info.food[food_id].quantity == food.quantity - 1
+    assert state.info.total_score["PlayerA"] == 2
+
+
+def test_players_cannot_move_food(state):
+    food_id, food = next(iter(state.info.food.items()))
+    distance_before = state.info.distances.distance.copy()
+    nearest_before = state.info.nearest_food(food.pos.i, food.pos.j)
+
+    pos = state.info.food[food_id].pos
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        pos.i = 0
+    pos += Dir.EAST
+
+    assert state.info.food[food_id].pos == food.pos != pos
+    assert state.grid.is_food(food.pos.i, food.pos.j)
+    assert (state.info.distances.distance == distance_before).all()
+    assert state.info.nearest_food(food.pos.i, food.pos.j) == nearest_before
+
+
+def test_batched_moves_match_move_commands():
+    def play(batched):
+        info = Info()
+        players = [PlayerA(), PlayerB()]
+        for player in players:
+            player.set_info(info)
+        state = State(info, players, seed=9, sink=MemorySink())
+        state.populate_board()
+        rng = random.Random(1)
+        for _ in range(10):
+            for player in players:
+                player.reset()
+                ids = list(player.mushrooms)
+                codes = [rng.randrange(len(DIRECTIONS)) for _ in ids]
+                if batched:
+                    player.execute_many(ids, codes)
+                else:
+                    for id, code in zip(ids, codes):
+                        player.execute(MoveCommand(id, DIRECTIONS[code]))
+            state.next()
+        return state._sink.lines
+
+    assert play(batched=True) == play(batched=False)
+
+
+def _fresh_players_info(state):
+    return {
+        name: {
+            "positions": [unit.pos for unit in player.mushrooms.values()],
+            "score": player.score,
+        }
+        for name, player in state._players.items()
+    }
+
+
+def test_players_info_follows_the_units():
+    state, players = _new_match(5)
+    for _ in range(80):
+        _play_round(state, players)
+        assert state.info.players == _fresh_players_info(state)
+    assert sum(len(player.mushrooms) for player in players) > 2
+
+
+def test_players_info_only_writes_the_changes(state):
+    unit = next(iter(state._players["PlayerA"].mushrooms.values()))
+    positions = state._positions["PlayerA"]
+    state._move_mushroom_unit(unit.id, DIRECTIONS[0])
+    state._split(unit.id)
+    state.update_mushroom_units_info()
+
+    assert state._positions["PlayerA"] is positions
+    assert state.info.players == _fresh_players_info(state)
+    assert not state._dirty_units
+
+
+def test_players_cannot_change_the_players_info_of_other_rounds(state):
+    unit = next(iter(state._players["PlayerA"].mushrooms.values()))
+    view = state.info.players["PlayerA"]
+    view["positions"][0] = Pos(0, 0)
+    view["positions"].append(Pos(1, 1))
+    state.update_mushroom_units_info()
+
+    assert state.info.players == _fresh_players_info(state)
+
+    # Lists kept from a round do not change when the units move
+    view = state.info.players["PlayerA"]
+    kept = list(view["positions"])
+    state._move_mushroom_unit(unit.id, DIRECTIONS[0])
+    state.update_mushroom_units_info()
+
+    assert view["positions"] == kept
+    assert state.info.players == _fresh_players_info(state)
@@ -0,0 +1,17 @@
+from game.tournament import run_tournament
+
+
+def test_run_tournament_plays_every_seed():
+    results = list(
+        run_tournament(
+            ["DumbPlayer", "DumbPlayer2"], range(1, 6), workers=2, chunksize=2
+        )
+    )
+
+    assert sorted(result.seed for result in results) == [1, 2, 3, 4, 5]
+    for result in results:
+        assert set(result.scores) == {"DumbPlayer", "DumbPlayer2"}
+        assert result.winners
+        assert all(
+            result.scores[w] == max(result.scores.values()) for w in result.winners
+        )
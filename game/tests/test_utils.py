@@ -1,8 +1,19 @@
-import uuid
+import copy
+import pickle
 
 import pytest
 
-from game.utils import Action, Dir, Pos, MoveCommand
+from game.utils import (
+    DIRECTIONS,
+    Action,
+    Cell,
+    Dir,
+    Food,
+    IdAllocator,
+    MoveCommand,
+    MushroomUnit,
+    Pos,
+)
 
 
 def test_pos_addition():
@@ -34,7 +45,7 @@ def test_pos_equality():
 
 def test_action_execute():
     action = Action()
-    mushroom_id = uuid.uuid4()
+    mushroom_id = 0
     direction = Dir.SOUTH
     command = MoveCommand(id=mushroom_id, dir=direction)
 
@@ -47,7 +58,7 @@ def test_action_execute():
 
 def test_action_execute_maximum_commands():
     action = Action()
-    mushroom_id = uuid.uuid4()
+    mushroom_id = 0
     direction = Dir.SOUTH
     command = MoveCommand(id=mushroom_id, dir=direction)
 
@@ -56,3 +67,51 @@ def test_action_execute_maximum_commands():
 
     with pytest.raises(RuntimeError):
         action.execute(command)
+
+
+def test_action_execute_many():
+    action = Action()
+    ids = [0, 1]
+
+    action.execute_many(ids, [DIRECTIONS.index(Dir.SOUTH), DIRECTIONS.index(Dir.EAST)])
+
+    assert action.commands_tried == 2
+    assert action.mushrooms_with_commands == set(ids)
+    assert action.commands_to_perform == []
+    assert action.batch_moves[0][0] == ids
+    assert [DIRECTIONS[code] for code in action.batch_moves[0][1]] == [
+        Dir.SOUTH,
+        Dir.EAST,
+    ]
+
+
+def test_action_execute_many_checks_its_input():
+    action = Action()
+    with pytest.raises(ValueError):
+        action.execute_many([0], [0, 1])
+    with pytest.raises(ValueError):
+        action.execute_many([0], [len(DIRECTIONS)])
+    with pytest.raises(ValueError):
+        action.execute_many([0], [256])
+    with pytest.raises(ValueError):
+        action.execute_many([0], [-256])
+
+    action.execute_many(list(range(Action.MAX_COMMANDS - 1)), [0] * 499)
+    with pytest.raises(RuntimeError):
+        action.execute_many([0, 1], [0, 0])
+    assert action.commands_tried == Action.MAX_COMMANDS - 1
+
+
+def test_game_objects_have_no_instance_dict():
+    food = Food(id=0, quantity=5, pos=Pos(1, 2))
+    for obj in (Pos(), Cell(), MushroomUnit(1, "p", Pos()), food):
+        assert not hasattr(obj, "__dict__")
+    assert pickle.loads(pickle.dumps(food)) == food
+    assert copy.deepcopy(food) == food
+
+
+def test_id_allocator_hands_out_dense_ids():
+    units, food = IdAllocator(), IdAllocator()
+    assert [units() for _ in range(3)] == [0, 1, 2]
+    assert food() == 0
+    assert units.next_id == 3
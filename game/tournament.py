@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator, Optional
+
+from game.cache import ResultCache
+from game.config import MatchConfig
+from game.main import discover_player_classes, play_match
+from game.register import Registry
+
+
+@dataclass
+class MatchResult:
+    """
+    Outcome of a single match of a tournament.
+    """
+
+    seed: int  # The seed the match was played with.
+    scores: dict[str, int]  # Final score of each player.
+    winners: list[str]  # Players with the top score.
+
+
+def _init_worker() -> None:
+    """
+    Import and register the players once per worker process instead of once per match.
+    """
+    discover_player_classes()
+
+
+def _play_matches(
+    matches: list[tuple[list[str], int, Optional[str]]],
+    config: Optional[MatchConfig] = None,
+) -> list[MatchResult]:
+    results = list()
+    for player_names, seed, replay_file in matches:
+        state = play_match(
+            player_names,
+            seed=seed,
+            output_file=None,
+            verbose=False,
+            replay_file=replay_file,
+            config=config,
+        )
+        scores, winners = state.results()
+        results.append(MatchResult(seed=seed, scores=scores, winners=winners))
+    return results
+
+
+def play_matches(
+    matches: Iterable[tuple[list[str], int]],
+    pool: Optional[Executor] = None,
+    chunksize: int = 1,
+    config: Optional[MatchConfig] = None,
+    cache: Optional[ResultCache] = None,
+) -> Iterator[MatchResult]:
+    """
+    Play matches between any players, on a pool of workers or in this process.
+
+    Args:
+        matches (Iterable[tuple[list[str], int]]): The names of the players and the seed of every match.
+        pool (Optional[Executor]): Pool of workers whose processes already registered the players, the matches are
+            played one after the other in this process if None.
+        chunksize (int): Number of matches sent to a worker at once.
+        config (Optional[MatchConfig]): Settings of the matches, the defaults of game.constants if None.
+        cache (Optional[ResultCache]): Cache of results, the matches found in it are not played again and the
+            results of the others are stored in it.
+
+    Yields:
+        MatchResult: The result of each match, as soon as it is finished. Cached results come first.
+    """
+    pending = list()
+    keys = list()
+    for player_names, seed in matches:
+        key = cache.key(player_names, seed, config) if cache is not None else None
+        replay_file = None
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                yield MatchResult(**cached)
+                continue
+            if cache.replays:
+                replay_file = cache.new_replay_file(key)
+        pending.append((player_names, seed, replay_file))
+        keys.append(key)
+
+    def store(first: int, results: list[MatchResult]) -> Iterator[MatchResult]:
+        for k, result in enumerate(results, first):
+            if keys[k] is not None:
+                cache.put(keys[k], asdict(result), pending[k][2])
+            yield result
+
+    starts = range(0, len(pending), chunksize)
+    if pool is None:
+        for first in starts:
+            yield from store(
+                first, _play_matches(pending[first : first + chunksize], config)
+            )
+        return
+    futures = {
+        pool.submit(_play_matches, pending[first : first + chunksize], config): first
+        for first in starts
+    }
+    for future in as_completed(futures):
+        yield from store(futures[future], future.result())
+
+
+def new_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Create a pool of worker processes that register the players once when they start.
+
+    Args:
+        workers (Optional[int]): Number of worker processes, one per core if None.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def run_tournament(
+    player_names: list[str],
+    seeds: Iterable[int],
+    workers: Optional[int] = None,
+    chunksize: int = 1,
+    cache: Optional[ResultCache] = None,
+) -> Iterator[MatchResult]:
+    """
+    Play one match per seed over a pool of worker processes.
+
+    Args:
+        player_names (list[str]): Names of the registered players taking part in every match.
+        seeds (Iterable[int]): Seeds of the matches to play.
+        workers (Optional[int]): Number of worker processes, one per core if None.
+        chunksize (int): Number of matches sent to a worker at once.
+        cache (Optional[ResultCache]): Cache of results, the matches found in it are not played again.
+
+    Yields:
+        MatchResult: The result of each match, as soon as it is finished.
+    """
+    with new_pool(workers) as pool:
+        yield from play_matches(
+            [(player_names, seed) for seed in seeds], pool, chunksize, cache=cache
+        )
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--cache", help="Directory of the cache of match results")
+    parser.add_argument(
+        "--cache-size", type=int, default=256, help="Size of the cache in MiB"
+    )
+    parser.add_argument(
+        "--cache-replays",
+        action="store_true",
+        help="Keep the replay of every match in the cache",
+    )
+
+
+def cache_from_arguments(args: argparse.Namespace) -> Optional[ResultCache]:
+    if args.cache is None:
+        return None
+    return ResultCache(args.cache, args.cache_size * 1024**2, args.cache_replays)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Play many seeded matches in parallel."
+    )
+    parser.add_argument(
+        "--players", nargs="+", help="Players taking part, all by default"
+    )
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the first match")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=1)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    discover_player_classes()
+    player_names = args.players or list(Registry.registered_players.keys())
+
+    start = time.time()
+    wins: Counter = Counter()
+    total_scores: dict[str, int] = defaultdict(int)
+    seeds = range(args.seed, args.seed + args.matches)
+    for result in run_tournament(
+        player_names, seeds, args.workers, args.chunksize, cache_from_arguments(args)
+    ):
+        print(f"Match {result.seed}: {result.scores} winners {result.winners}")
+        wins.update(result.winners)
+        for player_name, score in result.scores.items():
+            total_scores[player_name] += score
+
+    for player_name in player_names:
+        print(
+            f"Player {player_name} won {wins[player_name]} matches with mean score "
+            f"{total_scores[player_name] / args.matches:.1f}"
+        )
+    print(f"time elapsed {time.time()-start}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Enum, auto
-from typing import List, Set, Union
-from uuid import UUID
+from typing import Hashable, List, Sequence, Set, Union
+
+import numpy as np
 
 from game.constants import MAP_SIZE
 
@@ -23,10 +24,44 @@ class Dir(Enum):
     SOUTHWEST = (-1, 1)
 
 
-@dataclass
+# Directions by code, the code of a direction is its index in this tuple (used by the batch command API)
+DIRECTIONS: tuple[Dir, ...] = tuple(Dir)
+
+# (i, j) offset of every direction, reading Dir.value goes through the Enum machinery on every move
+DIR_OFFSETS: dict[Dir, tuple[int, int]] = {d: d.value for d in Dir}
+
+
+def slotted(cls: type) -> type:
+    """
+    Rebuild a dataclass with __slots__, so that its instances have no per-instance __dict__.
+
+    This is what dataclass(slots=True) does, which is only available from Python 3.10.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    namespace["__slots__"] = names
+    for name in names + ("__dict__", "__weakref__"):
+        namespace.pop(name, None)
+
+    # Frozen dataclasses cannot be restored through setattr by pickle or copy
+    def __getstate__(self):
+        return [getattr(self, name) for name in names]
+
+    def __setstate__(self, state):
+        for name, value in zip(names, state):
+            object.__setattr__(self, name, value)
+
+    namespace["__getstate__"] = __getstate__
+    namespace["__setstate__"] = __setstate__
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@slotted
+@dataclass(frozen=True)
 class Pos:
     """
-    Represents a position on the board with (i, j) coordinates.
+    Represents a position on the board with (i, j) coordinates. Positions are immutable, so the positions the engine
+    shares with the players cannot be changed from the players side.
     """
 
     i: int = 0
@@ -34,7 +69,7 @@ class Pos:
 
     def __iadd__(self, other: Union[Dir, Pos]) -> Pos:
         """
-        Perform in-place addition of the given direction or position.
+        Add the given direction or position, ``pos += dir`` binds pos to a new position.
 
         Args:
             other (Union[Dir, Pos]): The direction or position to add.
@@ -42,13 +77,7 @@ class Pos:
         Returns:
             Pos: The resulting position after the addition.
         """
-        if isinstance(other, Dir):
-            self.i += other.value[0]
-            self.j += other.value[1]
-        elif isinstance(other, Pos):
-            self.i += other.i
-            self.j += other.j
-        return self
+        return self + other
 
     def __add__(self, other: Union[Dir, Pos]) -> Pos:
         """
@@ -60,8 +89,9 @@ class Pos:
         Returns:
             Pos: The resulting position after the addition.
         """
-        if isinstance(other, Dir):
-            return Pos(self.i + other.value[0], self.j + other.value[1])
+        if other.__class__ is Dir:
+            di, dj = DIR_OFFSETS[other]
+            return Pos(self.i + di, self.j + dj)
         elif isinstance(other, Pos):
             return Pos(self.i + other.i, self.j + other.j)
 
@@ -96,56 +126,78 @@ class CellType(Enum):
     NORMAL = auto()
 
 
+@slotted
 @dataclass
 class Cell:
     """
     Represents a cell on the game board with its attributes.
     """
 
-    mushroom_id: Union[UUID, None] = None
-    food_id: Union[UUID, None] = None
+    mushroom_id: Union[int, None] = None
+    food_id: Union[int, None] = None
     type: CellType = CellType.NORMAL
 
 
+@slotted
 @dataclass
 class MushroomUnit:
     """
     Represents a mushroom unit with its attributes.
     """
 
-    id: UUID  # The unique id for this mushroom during the game.
+    id: int  # The unique id for this mushroom during the game.
     player: str  # The player that owns this mushroom.
     pos: Pos  # The position on the board.
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class Food:
     """
-    Represents food with its attributes.
+    Represents food with its attributes. Food is immutable, the engine replaces it when its quantity changes so that
+    snapshots handed to players never change under them.
     """
 
-    id: UUID  # The unique id for this food during the game.
+    id: int  # The unique id for this food during the game.
     quantity: int  # Quantity of food. This means that at least #quantity rounds are needed to finish this resource
     pos: Pos  # The position on the board.
 
 
+@slotted
 @dataclass
 class MoveCommand:
     """
     Represents a command with the ID of the mushroom unit and a direction.
     """
 
-    id: UUID
+    id: int
     dir: Dir
 
 
+@slotted
 @dataclass
 class BranchCommand:
     """
     Represents a branchding command with the ID of the mushroom unit
     """
 
-    id: UUID
+    id: int
+
+
+class IdAllocator:
+    """
+    Hands out the dense integer ids 0, 1, 2... of the entities of a match, so that they can index arrays.
+    """
+
+    __slots__ = ("next_id",)
+
+    def __init__(self, start: int = 0):
+        self.next_id: int = start
+
+    def __call__(self) -> int:
+        id = self.next_id
+        self.next_id += 1
+        return id
 
 
 class Action:
@@ -161,8 +213,10 @@ class Action:
         mushroom units that have already performed a command, and a counter for commands tried.
         """
         self.commands_tried: int = 0
-        self.mushrooms_with_commands: Set[UUID] = set()
+        self.mushrooms_with_commands: Set[int] = set()
         self.commands_to_perform: List[Union[BranchCommand, MoveCommand]] = []
+        self.batch_moves: List[tuple[Sequence[Hashable], np.ndarray]] = []
+        self.batch_splits: List[Hashable] = []
 
     def execute(self, command: Union[BranchCommand, MoveCommand]):
         """
@@ -180,6 +234,32 @@ class Action:
         self.commands_to_perform.append(command)
         self.mushrooms_with_commands.add(command.id)
 
+    def execute_many(self, ids: Sequence[Hashable], dirs: Sequence[int]) -> None:
+        """
+        Add one move per mushroom unit to the commands to perform in this round, without creating a MoveCommand for
+        each of them.
+
+        Args:
+            ids (Sequence[Hashable]): The ids of the mushroom units to move.
+            dirs (Sequence[int]): The code of the direction of each move, its index in DIRECTIONS.
+
+        Raises:
+            ValueError: If ids and dirs have different lengths or a direction code is unknown.
+            RuntimeError: If the moves would exceed the maximum number of commands, none of them is added then.
+        """
+        # Checked as wide integers first, casting to int8 would wrap codes such as 256 into valid ones
+        codes = np.asarray(dirs, dtype=np.int64)
+        if codes.shape != (len(ids),):
+            raise ValueError("There must be one direction per mushroom unit")
+        if len(codes) and (codes.min() < 0 or codes.max() >= len(DIRECTIONS)):
+            raise ValueError("Unknown direction code")
+        codes = codes.astype(np.int8)
+        if self.commands_tried + len(codes) > self.MAX_COMMANDS:
+            raise RuntimeError("Too many commands were asked in a round")
+        self.commands_tried += len(codes)
+        self.batch_moves.append((ids, codes))
+        self.mushrooms_with_commands.update(ids)
+
 
-def is_valid_position(pos: Pos) -> bool:
-    return 0 <= pos.i < MAP_SIZE and 0 <= pos.j < MAP_SIZE
+def is_valid_position(pos: Pos, size: int = MAP_SIZE) -> bool:
+    return 0 <= pos.i < size and 0 <= pos.j < size